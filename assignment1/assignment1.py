@@ -17,76 +17,117 @@ Assignment 1 - Complex Networks caracterization
 import networkx as nx
 import numpy as np
 from math import sqrt
+import os
 import sys
 import powerlaw
 from matplotlib import pyplot as pl
 
-def read_graph(filename):
-    graph = nx.Graph()
-    with open(filename, 'rb') as f:
-        for line in f:
-            nodes = line.split()
-            graph.add_edge(nodes[0], nodes[1])
-    graph = graph.to_undirected()
-    return graph
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from complexnets import load_graph
+from complexnets.centrality import betweenness_centrality, eigenvector_centrality
+from complexnets.centrality import pagerank as pagerank_centrality
+from complexnets.clustering import clustering_profile
+from complexnets.correlation import correlations
+from complexnets.distributions import binned_distribution, distribution
+from complexnets.fitting import fit_power_law, goodness_of_fit
+from complexnets.paths import distance_profile, eccentricity_extremes
+from complexnets.store import MeasurementStore
+
+# medidas já calculadas, por estrutura de rede (também salvas em disco)
+store = MeasurementStore(directory=os.path.join("networks", "__graphcache__", "measures"))
+
+# erro máximo (com probabilidade 1 - 0.1) da betweenness amostrada; None calcula
+# a betweenness exata
+betweenness_epsilon = None
+
+# faixas dos histogramas de centralidade
+centrality_bins = 50
+
+# réplicas de bootstrap do p-valor da lei de potência (2500 dão erro de 0.01)
+power_law_replicates = 2500
+
+# réplicas de bootstrap para os intervalos de confiança das correlações
+bootstrap_replicates = 1000
+
+# nome e cor de cada rede nos gráficos, na ordem em que são lidas
+networks = (("euroroad", '#FF7676'), ("hamster", '#F6F49D'),
+            ("powergrid", '#5DAE8B'), ("airports", '#466C95'))
 
 
 def draw_graph(graph):
-    nx.draw(graph)
+    nx.draw(graph.to_networkx())
     pl.show()
 
 
 def stat_moment(graph, moment):
-    measure = 0
-    for node in graph.nodes_iter():
-        measure += graph.degree(node) ** moment
-    return measure / graph.number_of_nodes()
+    return np.mean(graph.degree().astype(np.float64) ** moment)
 
 
-def giant_component(graph):
-    return nx.Graph(max(nx.connected_component_subgraphs(graph), key=len))
+def degree_distribution(graph):
+    # graus presentes na rede com contagem, pdf e ccdf
+    return distribution(graph.degree())
 
 
-def degree_distribution(graph):
-    degrees = {}
-    for node in graph.nodes_iter():
-        degree = graph.degree(node)
-        if degree not in degrees:
-            degrees[degree] = 0
-        degrees[degree] += 1
-    distribution = sorted(degrees.values())
-    return distribution
+def power_law(graph, replicates):
+    # ajuste discreto aos graus, com p-valor de bootstrap e testes de razão
+    # de verossimilhança contra lognormal e exponencial
+    fit = fit_power_law(graph.degree())
+    fit.p = goodness_of_fit(fit, replicates)
+    fit.lognormal = fit.compare('lognormal')
+    fit.exponential = fit.compare('exponential')
+    return fit
 
 
 def is_scale_free(graph):
 
-    distribution = degree_distribution(graph)
-    distribution = [x for x in distribution if x != 0]
+    fit = store.get(graph, "power_law", power_law, replicates=power_law_replicates)
+    coefficient = fit.alpha
 
-    np.seterr(divide='ignore', invalid='ignore')
-    fit = powerlaw.Fit(distribution)
-    coefficient = fit.power_law.alpha
-
-    print("Coeficiente de distribuição de grau: %.4f" % (coefficient))
-    if (coefficient >= 2 and coefficient <= 3):
+    print("Coeficiente de distribuição de grau: %.4f (k_min = %d)" % (coefficient, fit.xmin))
+    print("p-valor do ajuste: %.4f" % (fit.p))
+    print("Lei de potência x lognormal: R = %.4f, p = %.4f" % fit.lognormal)
+    print("Lei de potência x exponencial: R = %.4f, p = %.4f" % fit.exponential)
+    if (coefficient >= 2 and coefficient <= 3 and fit.p >= 0.1):
         print("Rede livre de escala")
     else:
         print("Rede não é livre de escala")
 
 
-def centrality_distribution(centrality):
-    dists = {}
-    for value in centrality.values():
-        if value not in dists:
-            dists[value] = 0
-        dists[value] += 1
-    return list(dists.values())
+def distances(graph):
+    # uma única passada de BFS por rede alimenta histograma, caminho médio,
+    # diâmetro e closeness
+    return store.get(graph, "distances", distance_profile)
+
+
+def betweenness(graph):
+    return store.get(graph, "betweenness", betweenness_centrality, epsilon=betweenness_epsilon)
+
+
+def eigenvector(graph):
+    return store.get(graph, "eigenvector", eigenvector_centrality, max_iter=1000)
+
+
+def pagerank(graph):
+    return store.get(graph, "pagerank", pagerank_centrality)
+
+
+def clustering(graph):
+    # triângulos contados uma vez por rede alimentam aglomeração local,
+    # média e transitividade
+    return store.get(graph, "clustering", clustering_profile)
+
+
+def centrality_distribution(centrality, bins=None):
+    # valores distintos da centralidade, ou faixas de mesma largura com bins
+    if bins is None:
+        return distribution(centrality)
+    return binned_distribution(centrality, bins)
 
 
 def centralities_histogram(graphs):
     i = 0
     # configurar gráfico
-    for graph in graphs:
+    for graph in graphs.values():
         fig, ((ax0, ax1), (ax2, ax3))  = pl.subplots(2, 2)  
         if (i == 0):
             ax0.set_title("Euroroad\nDistribuição das medidas de centralidade\n")
@@ -98,25 +139,19 @@ def centralities_histogram(graphs):
             ax0.set_title("Airports\nDistribuição das medidas de centralidade\n")
         
         # medidas de centralidade
-        betweenness_centrality = centrality_distribution(nx.betweenness_centrality(graph))
-        closeness_centrality = centrality_distribution(nx.closeness_centrality(graph))
-        eigenvector_centrality = centrality_distribution(nx.eigenvector_centrality(graph, max_iter=1000))
-        pagerank = centrality_distribution(nx.pagerank(graph))
+        betweenness_centrality = centrality_distribution(betweenness(graph), centrality_bins)
+        closeness_centrality = centrality_distribution(distances(graph).closeness(), centrality_bins)
+        eigenvector_centrality = centrality_distribution(eigenvector(graph), centrality_bins)
+        pagerank_centrality = centrality_distribution(pagerank(graph), centrality_bins)
 
-        # normalizar
-        betweenness_centrality = [x/max(betweenness_centrality) for x in betweenness_centrality]
-        closeness_centrality = [x/max(closeness_centrality) for x in closeness_centrality]
-        eigenvector_centrality = [x/max(eigenvector_centrality) for x in eigenvector_centrality]
-        pagerank = [x/max(pagerank) for x in pagerank]
-        
-        # plotar distribuições
-        ax0.plot(betweenness_centrality, color='#FF7676', marker='None')
+        # plotar distribuições (densidade por faixa de valores)
+        ax0.plot(betweenness_centrality.value, betweenness_centrality.pdf, color='#FF7676', marker='None')
         ax0.set_xlabel('Betweenness Centrality')
-        ax1.plot(closeness_centrality, color='#F6F49D', marker='None')
+        ax1.plot(closeness_centrality.value, closeness_centrality.pdf, color='#F6F49D', marker='None')
         ax1.set_xlabel('Closeness Centrality')
-        ax2.plot(eigenvector_centrality, color='#5DAE8B', marker='None')
+        ax2.plot(eigenvector_centrality.value, eigenvector_centrality.pdf, color='#5DAE8B', marker='None')
         ax2.set_xlabel('Eigenvector Centrality')
-        ax3.plot(pagerank, color='#466C95', marker='None')
+        ax3.plot(pagerank_centrality.value, pagerank_centrality.pdf, color='#466C95', marker='None')
         ax3.set_xlabel('PageRank')
 
         pl.legend(loc='upper right')
@@ -137,20 +172,12 @@ def centralities_histogram(graphs):
 
 
 def entropy(graph):
-    entropy = 0
-    distribution = degree_distribution(graph)
-
-    for value in distribution:
-        if value > 0:
-            val = (value / graph.number_of_nodes())
-            entropy -= (val) * math.log2(val)
-    return entropy
+    pdf = degree_distribution(graph).pdf
+    return -np.sum(pdf * np.log2(pdf))
 
 
 def average_degree(graph):
-    degrees = graph.degree().values()
-    average = sum(degrees)/len(degrees)
-    return average
+    return np.mean(graph.degree())
 
 
 def measures(graph):
@@ -158,11 +185,14 @@ def measures(graph):
     print("Número de vértices: ",len(graph))
     print("Grau médio: %.4f" % (average_degree(graph)))
     print("Segundo momento da distribuição do grau: %.4f" % (stat_moment(graph, 2)))
-    print("Média do coef. de aglomeração local: %.4f" % (nx.average_clustering(graph)))
-    print("Transitividade: %.4f" % (nx.transitivity(graph)))
-    print("Média dos menores caminhos: %.4f" % (nx.average_shortest_path_length(graph)))
-    print("Diâmetro: %.1f" % (nx.diameter(graph)))
-    alpha = (powerlaw.Fit(centrality_distribution(nx.betweenness_centrality(graph)))).alpha
+    print("Média do coef. de aglomeração local: %.4f" % (clustering(graph).average_clustering()))
+    print("Transitividade: %.4f" % (clustering(graph).transitivity()))
+    print("Média dos menores caminhos: %.4f" % (distances(graph).average_shortest_path_length()))
+    # diâmetro e raio exatos por limites de excentricidade, com poucas BFS
+    extremes = store.get(graph, "extremes", eccentricity_extremes)
+    print("Diâmetro: %.1f" % (extremes.diameter))
+    print("Raio: %.1f" % (extremes.radius))
+    alpha = (powerlaw.Fit(centrality_distribution(betweenness(graph)).count)).alpha
     if alpha >= 2 and alpha <= 3:
         print("Betweenness Centrality obedece lei de potência")
     else:
@@ -170,19 +200,9 @@ def measures(graph):
 
 
 def shortest_paths_distribution(graph):
-    lengths = nx.shortest_path_length(graph)
-    frequences = {}
-    # pegar todas as distancias entre todos os nós
-    for source, targets in lengths.items():
-        for target in targets:
-            
-            length = lengths[source][target]
-
-            if length not in frequences:
-                frequences[length] = 0
-            frequences[length] += 1
-
-    return list(frequences.values())
+    # frequência exata de cada distância entre todos os pares de nós, indexada
+    # pela distância; vem da mesma passada de BFS de distances()
+    return distances(graph).histogram
 
 
 def shortest_paths_histograms(graphs):
@@ -193,22 +213,17 @@ def shortest_paths_histograms(graphs):
     dists = {}
     current = 0
     # encontrar distribuições
-    for graph in graphs:
+    for graph in graphs.values():
         dists[graph] = shortest_paths_distribution(graph)
         print("Found distribution for ", current)
         current += 1
         # normalizar
-        dists[graph] = [x/sum(dists[graph]) for x in dists[graph]]
-
-    # plotar distribuições
-    x = np.linspace(0, nx.diameter(graphs[euroroad]) + 1, len(dists[euroroad]))
-    plot.plot(x, dists[euroroad], color='#FF7676', marker='None', label='euroroad')
-    x = np.linspace(0, nx.diameter(graphs[hamster]) + 1, len(dists[hamster]))
-    plot.plot(x, dists[hamster], color='#F6F49D', marker='None', label='hamster')
-    x = np.linspace(0, nx.diameter(graphs[powergrid]) + 1, len(dists[powergrid]))
-    plot.plot(x, dists[powergrid], color='#5DAE8B', marker='None', label='powergrid')
-    x = np.linspace(0, nx.diameter(graphs[airports]) + 1, len(dists[airports]))
-    plot.plot(x, dists[airports], color='#466C95', marker='None', label='airports')
+        dists[graph] = dists[graph] / dists[graph].sum()
+
+    # plotar distribuições (distâncias de 0 ao diâmetro)
+    for graph, (label, color) in zip(graphs.values(), networks):
+        x = np.arange(len(dists[graph]))
+        plot.plot(x, dists[graph], color=color, marker='None', label=label)
     
     # configurar visual do gráfico
     plot.spines['right'].set_visible(False)
@@ -228,13 +243,7 @@ def shortest_paths_histograms(graphs):
 
 
 def clustering_distribution(graph):
-    coefficients = list((nx.clustering(graph)).values())
-    dist = {}
-    for value in coefficients:
-        if value not in dist:
-            dist[value] = 0
-        dist[value] += 1
-    return list(dist.values())
+    return distribution(clustering(graph).local())
 
 
 def clustering_histograms(graphs):
@@ -242,22 +251,13 @@ def clustering_histograms(graphs):
     pl.title("Distribuição acumulada do coeficiente de aglomeração local")
 
     dists = {}
-    # encontrar distribuições
-    for graph in graphs:
-        dists[graph] = clustering_distribution(graph)
-        # normalizar
-        dists[graph] = [x/sum(dists[graph]) for x in dists[graph]]
-        # fazer distribuição acumulada
-        dists[graph] = np.cumsum(dists[graph])
-
-    x = np.linspace(0, 1, len(dists[euroroad]))
-    plot.plot(x, dists[euroroad], color='#FF7676',label='euroroad')
-    x = np.linspace(0, 1, len(dists[hamster]))
-    plot.plot(x, dists[hamster], color='#F6F49D',label='hamster')
-    x = np.linspace(0, 1, len(dists[powergrid]))
-    plot.plot(x, dists[powergrid], color='#5DAE8B',label='powergrid')
-    x = np.linspace(0, 1, len(dists[airports]))
-    plot.plot(x, dists[airports], color='#466C95',label='airports')
+    # encontrar distribuições nas componentes gigantes, indexadas pela rede
+    for graph, giant in graphs.items():
+        dists[graph] = clustering_distribution(giant)
+
+    # distribuição acumulada em cada valor de coeficiente presente
+    for graph, (label, color) in zip(graphs, networks):
+        plot.plot(dists[graph].value, np.cumsum(dists[graph].pdf), color=color, label=label)
 
     # configurar visual do gráfico
     plot.spines['right'].set_visible(False)
@@ -276,114 +276,30 @@ def clustering_histograms(graphs):
     pl.show()
 
 
-def pearson(x, y):
-    nx = len(x)
-    ny = len(y)
-
-    if nx != ny:
-        print("TAMANHOS DIFERENTES")
-
-    sum_x = sum([float(a) for a in x])
-    sum_y = sum([float(b) for b in y])
-
-    sum_xy = sum([a * b for a, b  in zip(x,y)])
-
-    sum_x2 = sum([a ** 2 for a in x])
-    sum_y2 = sum([b ** 2 for b in x])
-
-    top = nx * sum_xy - (sum_x * sum_y)
-
-    bottom_1 = (nx * sum_x2 - sum_x ** 2) ** .5
-    bottom_2 = (ny * sum_y2 - sum_y ** 2) ** .5
-    result = top / (bottom_1 * bottom_2)
-
-    return result.real
-
 def pearson_scatter(graphs):
     i = 0
-    for graph in graphs:
+    for graph in graphs.values():
 
         plot = pl.subplot()
 
-        # medidas de centralidade
-        betweenness_centrality = list((nx.betweenness_centrality(graph)).values())
-        closeness_centrality = list((nx.closeness_centrality(graph)).values())
-        eigenvector_centrality = list((nx.eigenvector_centrality(graph, max_iter=1000)).values())
-        pagerank = list((nx.pagerank(graph)).values())
-
-        # coeficientes de pearson
-        c1 = (pearson(betweenness_centrality, closeness_centrality))
-        c2 = (pearson(betweenness_centrality, eigenvector_centrality))
-        c3 = (pearson(betweenness_centrality, pagerank))
-        c4 = (pearson(closeness_centrality, eigenvector_centrality))
-        c5 = (pearson(closeness_centrality, pagerank))
-        c6 = (pearson(eigenvector_centrality, pagerank))
-
-        print("Betweenness x Closeness", c1)
-        print("Betweenness x Eigenvector", c2)
-        print("Betweenness x Pagerank", c3)
-        print("Closeness x Eigenvector", c4)
-        print("Closeness x Pagerank", c5)
-        print("Eigenvector x Pagerank", c6)
-
-
-        # ordenar
-        coefficients = []
-        coefficients.extend((c1,c2,c3,c4,c5,c6))
-        sorted_coefficients = sorted(coefficients)
-
-        # índices para representar centralidades no gráfico
-        # também conhecido como gambiarra de iniciante em python
-        # 0 = betweenness
-        # 1 = closeness
-        # 2 = eigenvector
-        # 3 = pagerank
-
-        if (sorted_coefficients[5] == c1):
-            index_a = 0
-            index_b = 1
-        if (sorted_coefficients[5] == c2):
-            index_a = 0
-            index_b = 2
-        if (sorted_coefficients[5] == c3):
-            index_a = 0
-            index_b = 3
-        if (sorted_coefficients[5] == c4):
-            index_a = 1
-            index_b = 2
-        if (sorted_coefficients[5] == c5):
-            index_a = 1
-            index_b = 3
-        if (sorted_coefficients[5] == c6):
-            index_a = 2
-            index_b = 3
-
-        # pegar medidas para serem plotadas e configurar legenda
-        if (index_a == 0):
-            a = betweenness_centrality
-            label_a = "Betweenness Centrality"
-        if (index_a == 1):
-            a = closeness_centrality
-            label_a = "Closeness Centrality"
-        if (index_a == 2):
-            a = eigenvector_centrality
-            label_a = "Eigenvector Centrality"
-        if (index_a == 3):
-            a = pagerank
-            label_a = "PageRank"
-
-        if (index_b == 0):
-            b = betweenness_centrality
-            label_b = "Betweenness Centrality"
-        if (index_b == 1):
-            b = closeness_centrality
-            label_b = "Closeness Centrality"
-        if (index_b == 2):
-            b = eigenvector_centrality
-            label_b = "Eigenvector Centrality"
-        if (index_b == 3):
-            b = pagerank
-            label_b = "PageRank"
+        # medidas de centralidade, uma por linha
+        names = ["Betweenness", "Closeness", "Eigenvector", "Pagerank"]
+        labels = ["Betweenness Centrality", "Closeness Centrality", "Eigenvector Centrality", "PageRank"]
+        centralities = np.vstack((betweenness(graph), distances(graph).closeness(),
+                                  eigenvector(graph), pagerank(graph)))
+
+        # coeficientes de pearson e spearman de todos os pares de uma vez
+        result = correlations(centralities, replicates=bootstrap_replicates)
+        for index_a, index_b in zip(*np.triu_indices(len(names), 1)):
+            print("%s x %s" % (names[index_a], names[index_b]), result.pearson[index_a, index_b])
+            print("    spearman", result.spearman[index_a, index_b])
+            if result.pearson_interval is not None:
+                print("    intervalo (pearson)", result.pearson_interval[:, index_a, index_b])
+
+        # par de centralidades mais correlacionado
+        index_a, index_b = result.pair
+        a, label_a = centralities[index_a], labels[index_a]
+        b, label_b = centralities[index_b], labels[index_b]
 
         # scatter plot das duas medidas
         print("Configurando gráfico")
@@ -423,53 +339,33 @@ def pearson_scatter(graphs):
         i += 1
 
 
-# ler redes
-euroroad = read_graph("./networks/euroroad.txt")
-hamster = read_graph("./networks/hamster.txt")
-powergrid = read_graph("./networks/us-powergrid.txt")
-airports = read_graph("./networks/us-airports.txt")
-
-graphs = []
-graphs.append(euroroad)
-graphs.append(hamster)
-graphs.append(powergrid)
-graphs.append(airports)
-
-# pegar maior componente
-giants = {}
-for graph in graphs:
-    giants[graph] = giant_component(graph)
-
-# histogramas
-shortest_paths_histograms(giants)
-clustering_histograms(giants)
-centralities_histogram(giants)
-
-# pearson
-pearson_scatter(giants)
-
-medidas
-print("---------------------")
-print("EuroRoad")
-measures(giants[euroroad])
-print("Entropia de Shannon: %.4f" % (entropy(giants[euroroad])))
-is_scale_free(giants[euroroad])
-print("---------------------")
-
-print("Hamster")
-measures(giants[hamster])
-print("Entropia de Shannon: %.4f" % (entropy(giants[hamster])))
-is_scale_free(giants[hamster])
-print("---------------------")
-
-print("Powergrid")
-measures(giants[powergrid])
-print("Entropia de Shannon: %.4f" % (entropy(giants[powergrid])))
-is_scale_free(giants[powergrid])
-print("---------------------")
-
-print("Airports")
-measures(giants[airports])
-print("Entropia de Shannon: %.4f" % (entropy(giants[airports])))
-is_scale_free(giants[airports])
-print("---------------------")
\ No newline at end of file
+def main():
+    # ler redes e maior componente (do cache quando o arquivo não mudou)
+    giants = {}
+    euroroad, giants[euroroad] = load_graph("./networks/euroroad.txt")
+    hamster, giants[hamster] = load_graph("./networks/hamster.txt")
+    powergrid, giants[powergrid] = load_graph("./networks/us-powergrid.txt")
+    airports, giants[airports] = load_graph("./networks/us-airports.txt")
+
+    # histogramas
+    shortest_paths_histograms(giants)
+    clustering_histograms(giants)
+    centralities_histogram(giants)
+
+    # pearson
+    pearson_scatter(giants)
+
+    # medidas
+    print("---------------------")
+    for graph, title in zip(giants.values(), ("EuroRoad", "Hamster", "Powergrid", "Airports")):
+        print(title)
+        measures(graph)
+        print("Entropia de Shannon: %.4f" % (entropy(graph)))
+        is_scale_free(graph)
+        print("---------------------")
+
+
+# os processos dos pools reimportam este módulo: só executar quando chamado
+# diretamente
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,10 @@ Gabriel Henrique Scalici - 9292970
 Assignment 2 - Correlation and Communities
 """
 
-import networkx as nx
 import igraph as ig
 
+import os
+import sys
 from itertools import *
 
 import numpy as np
@@ -26,47 +27,41 @@ from subprocess import call
 
 from sklearn.metrics import normalized_mutual_info_score
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from complexnets import Graph, load_graph, read_edgelist
+from complexnets.community import louvain, merge_modularity
+from complexnets.correlation import correlations
+from complexnets.mixing import average_neighbor_degree, degree_assortativity, degree_connectivity
+from complexnets.nullmodel import null_model_zscores
+
 # plot colors
 colors = ["#1abc9c", "#2ecc71", "#3498db", "#f1c40f", "#e67e22", "#e74c3c", "#2c3e50"]
 
-
-def pearson(x, y):
-    n = len(x)
-    sum_x = float(sum(x))
-    sum_y = float(sum(y))
-    sum_x_sq = sum(map(lambda x: pow(x, 2), x))
-    sum_y_sq = sum(map(lambda x: pow(x, 2), y))
-    psum = sum(map(lambda x, y: x * y, x, y))
-    num = psum - (sum_x * sum_y / n)
-    den = pow((sum_x_sq - pow(sum_x, 2) / n) * (sum_y_sq - pow(sum_y, 2) / n), 0.5)
-    if den == 0: return 0
-    return num / den
-
-
-def giant_component(graph):
-    return nx.Graph(max(nx.connected_component_subgraphs(graph), key=len))
+# degree-preserving rewired replicas per network for the z-scores
+null_replicates = 100
 
 
 def read_graph(filename):
-    graph = nx.Graph()
-    with open(filename, 'rb') as f:
-        for line in f:
-            nodes = line.split()
-            graph.add_edge(nodes[0], nodes[1])
-    graph = graph.to_undirected()
-    return giant_component(graph)
+    graph, giant = load_graph(filename)
+    return giant
 
 
-def nx_to_ig(graph):
-    g = ig.Graph.TupleList(graph.edges(), directed=False)
+def to_ig(graph):
+    sources, targets = graph.edges()
+    g = ig.Graph(n=graph.number_of_nodes(), edges=list(zip(sources.tolist(), targets.tolist())), directed=False)
     return g
 
 
 def assortativity(graphs):
     print("ASSORTATIVITY")
     for name, graph in graphs.items():
-        assortativity = nx.degree_assortativity_coefficient(graph)
+        assortativity = degree_assortativity(graph)
         print("%s: %.4f" % (name, assortativity))
+        # significance against degree-preserving random rewirings
+        null = null_model_zscores(graph, replicates=null_replicates, seed=0)
+        for measure, comparison in sorted(null.items()):
+            print("    %s: %.4f, null model %.4f +- %.4f, z = %.2f" % (
+                measure, comparison.observed, comparison.mean, comparison.std, comparison.z))
 
 
 def k_x_knn(graphs):
@@ -75,10 +70,10 @@ def k_x_knn(graphs):
     for name, graph in graphs.items():
         print(name)
 
-        degrees = list(graph.degree().values())
-        knn_degrees = list((nx.average_degree_connectivity(graph)).values())
-        knn_vertex = list((nx.average_neighbor_degree(graph)).values())
-        k = range(1, len(knn_degrees) + 1)
+        # arrays indexed by node: degree and knn of the same node line up
+        degrees = graph.degree()
+        knn_vertex = average_neighbor_degree(graph)
+        k, knn_degrees = degree_connectivity(graph)
 
         # prepare plotting area
         sns.set()
@@ -115,7 +110,7 @@ def k_x_knn(graphs):
         i += 1
 
         # correlation k(x) x knn(x)
-        correlation = pearson(graph.degree().values(), knn_vertex)
+        correlation = correlations(np.vstack((degrees, knn_vertex))).pearson[0, 1]
         print("pearson correlation coefficient: %.4f" % correlation)
 
 
@@ -124,11 +119,11 @@ def modularities(graphs):
 
     for name, graph in graphs.items():
         print(name)
+        # louvain and leiden, straight on the graph arrays
+        print("louvain: %.4f" % (louvain(graph, refine=False, seed=0).modularity))
+        print("leiden: %.4f" % (louvain(graph, seed=0).modularity))
         # convert to igraph
-        g = nx_to_ig(graph)
-        # edge betweenness centrality
-        community = g.community_edge_betweenness(directed=False).as_clustering()
-        print("edge betweenness centrality: %.4f" % (community.modularity))
+        g = to_ig(graph)
         # fast-greedy
         community = g.community_fastgreedy().as_clustering()
         print("fast greedy: %.4f" % (community.modularity))
@@ -145,26 +140,16 @@ def plot_modularity_evolution(graphs):
     for name, graph in graphs.items():
         print(name)
         # convert
-        g = nx_to_ig(graph)
+        g = to_ig(graph)
 
         # fast-greedy
         evolution = g.community_fastgreedy()
         count = evolution.optimal_count
 
-        # aux
-        count = count - 1
-        tam = len(g.vs)
-
-        # axis
-        value_x = range(tam, count, -1)
-        value_y = np.zeros(len(value_x))
-
-        list_values_y = range(len(value_y))
-        for i in list_values_y:
-            value_y[i] = evolution.as_clustering(n=value_x[i]).modularity
-
-        # reverse
-        value_x = value_x[::-1]
+        # modularity after every merge down to the optimal count, replaying
+        # the dendrogram once
+        value_y = merge_modularity(graph, evolution.merges)[:len(g.vs) - count + 1]
+        value_x = np.arange(len(value_y))
 
         # plot
         sns.set()
@@ -182,7 +167,8 @@ def communities():
 
     # initialize NMI vectors
     nmi = {}
-    nmi["edge_bet"] = []
+    nmi["louvain"] = []
+    nmi["leiden"] = []
     nmi["fastgreedy"] = []
     nmi["eigenvector"] = []
     nmi["walktrap"] = []
@@ -206,15 +192,20 @@ def communities():
         mems = open('./community.dat')
         for line in mems:
             memberships.append(int(line.split()[1]))  # append community id
+        # the same network on the graph arrays, nodes numbered from 1
+        sources, targets = read_edgelist('./network.dat')
+        graph = Graph.from_edges(sources - 1, targets - 1, len(memberships))
 
         # apply detection algorithms and get new memberships vectors
-        detection_edge_bet = g.community_edge_betweenness(directed=False).as_clustering().membership
+        detection_louvain = louvain(graph, refine=False, seed=0).membership
+        detection_leiden = louvain(graph, seed=0).membership
         detection_fastgreedy = g.community_fastgreedy().as_clustering().membership
         detection_eigenvector = g.community_leading_eigenvector().membership
         detection_walktrap = g.community_walktrap().as_clustering().membership
 
         # NMI
-        nmi["edge_bet"].append(normalized_mutual_info_score(memberships, detection_edge_bet))
+        nmi["louvain"].append(normalized_mutual_info_score(memberships, detection_louvain))
+        nmi["leiden"].append(normalized_mutual_info_score(memberships, detection_leiden))
         nmi["fastgreedy"].append(normalized_mutual_info_score(memberships, detection_fastgreedy))
         nmi["eigenvector"].append(normalized_mutual_info_score(memberships, detection_eigenvector))
         nmi["walktrap"].append(normalized_mutual_info_score(memberships, detection_walktrap))
@@ -222,7 +213,8 @@ def communities():
     # plot
     sns.set()
 
-    pp.plot(mu, nmi["edge_bet"], color=colors[0], linestyle='solid', marker='o', label='edge betweenness centrality')
+    pp.plot(mu, nmi["louvain"], color=colors[0], linestyle='solid', marker='o', label='louvain')
+    pp.plot(mu, nmi["leiden"], color=colors[2], linestyle='solid', marker='o', label='leiden')
     pp.plot(mu, nmi["fastgreedy"], color=colors[3], linestyle='solid', marker='o', label='fastgreedy')
     pp.plot(mu, nmi["eigenvector"], color=colors[5], linestyle='solid', marker='o', label='eigenvetor matrices')
     pp.plot(mu, nmi["walktrap"], color=colors[6], linestyle='solid', marker='o', label='walktrap')
@@ -236,23 +228,29 @@ def communities():
     pp.savefig('plots/nmi.png')
 
 
-# read networks
-graphs = {}
-graphs["Euroroad"] = read_graph("./networks/euroroad.txt")
-graphs["Hamster"] = read_graph("./networks/hamster.txt")
-graphs["Airports"] = read_graph("./networks/USairports.txt")
-graphs["Cortical Human"] = read_graph("./networks/cortical-human.txt")
-graphs["Cortical Cat"] = read_graph("./networks/cortical-cat.txt")
-graphs["Cortical Monkey"] = read_graph("./networks/cortical-monkey.txt")
-
-# 1
-assortativity(graphs)
-# 2
-k_x_knn(graphs)
-# 3, 6
-# modularities(graphs)
-# 5
-plot_modularity_evolution(graphs)
-# 7
-communities()
-print("done")
+def main():
+    # read networks
+    graphs = {}
+    graphs["Euroroad"] = read_graph("./networks/euroroad.txt")
+    graphs["Hamster"] = read_graph("./networks/hamster.txt")
+    graphs["Airports"] = read_graph("./networks/USairports.txt")
+    graphs["Cortical Human"] = read_graph("./networks/cortical-human.txt")
+    graphs["Cortical Cat"] = read_graph("./networks/cortical-cat.txt")
+    graphs["Cortical Monkey"] = read_graph("./networks/cortical-monkey.txt")
+
+    # 1
+    assortativity(graphs)
+    # 2
+    k_x_knn(graphs)
+    # 3, 6
+    modularities(graphs)
+    # 5
+    plot_modularity_evolution(graphs)
+    # 7
+    communities()
+    print("done")
+
+
+# pool workers re-import this module: only run when executed directly
+if __name__ == "__main__":
+    main()
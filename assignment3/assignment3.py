@@ -14,10 +14,6 @@ Gabriel Henrique Scalici - 9292970
 Assignment 3 - Modelling complex networks, failures and attacks
 '''
 
-# networks
-import networkx as nx
-import igraph as ig
-
 # data processing
 import numpy as np
 from sklearn.preprocessing import normalize
@@ -27,90 +23,90 @@ from matplotlib import pyplot as pp
 import seaborn as sns
 
 # tools
-import math
-import random
+import os
+import sys
+from functools import partial
+from multiprocessing import Pool
 import progressbar
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from complexnets import giant_component
+from complexnets.clustering import average_clustering
+from complexnets.distributions import distribution
+from complexnets.ensemble import run_ensemble
+from complexnets.generators import barabasi_albert, erdos_renyi, watts_strogatz
+from complexnets.mixing import degree_assortativity
+from complexnets.paths import average_shortest_path_length
+from complexnets.percolation import attack_curve, failure_curve
+
 # plot colors
 colors = ["#1abc9c", "#2ecc71", "#3498db", "#f1c40f", "#e67e22", "#e74c3c", "#2c3e50"]
 
 # graph functions
-def giant_component(graph):
-    return nx.Graph(max(nx.connected_component_subgraphs(graph), key=len))
-
-
 def stat_moment(graph, moment):
-    measure = 0
-    for node in graph.nodes_iter():
-        measure += graph.degree(node) ** moment
-    return measure / graph.number_of_nodes()
+    return np.mean(graph.degree().astype(np.float64) ** moment)
 
 
 def degree_distribution(graph):
-    degrees = {}
-    for node in graph.nodes_iter():
-        degree = graph.degree(node)
-        if degree not in degrees:
-            degrees[degree] = 0
-        degrees[degree] += 1
-    distribution = sorted(degrees.values())
-    return distribution
+    return distribution(graph.degree())
 
 def average_degree(graph):
-    degrees = graph.degree().values()
-    average = sum(degrees)/len(degrees)
-    return average
+    return np.mean(graph.degree())
 
 def entropy(graph):
-    entropy = 0
-    distribution = degree_distribution(graph)
-
-    for value in distribution:
-        if value > 0:
-            val = (value / graph.number_of_nodes())
-            entropy -= (val) * math.log2(val)
-    return entropy
+    pdf = degree_distribution(graph).pdf
+    return -np.sum(pdf * np.log2(pdf))
 
 # helper functions
-def nx_to_ig(graph):
-    g = ig.Graph.TupleList(graph.edges(), directed=False)
-    return g
-
-def ig_to_nx(graph):
-    A = graph.get_edgelist()
-    g = nx.Graph(A)
-    return g
+def median(stats):
+    return stats.median()
+
+def deviation(stats):
+    return stats.std(ddof=1)
+
+def take_measures(graph):
+    measures = {}
+    measures["lens"] = len(graph)
+    measures["degrees"] = average_degree(graph)
+    measures["clusterings"] = average_clustering(graph)
+    measures["assortativities"] = degree_assortativity(graph)
+    # ensemble workers cannot start a pool of their own
+    measures["shortest_paths"] = average_shortest_path_length(graph, processes=1)
+    measures["entropies"] = entropy(graph)
+    measures["moments"] = stat_moment(graph, 2)
+    return measures
+
+def print_measures(measures, statistic):
+    print("Number of nodes = %d" % statistic(measures["lens"]))
+    print("Degrees = %.4f" % statistic(measures["degrees"]))
+    print("Clustering coefficient = %.4f" % statistic(measures["clusterings"]))
+    print("Assortativity = %.4f" % statistic(measures["assortativities"]))
+    print("Shortest paths = %.4f" % statistic(measures["shortest_paths"]))
+    print("Shannon entropies = %.4f" % statistic(measures["entropies"]))
+    print("Second stat moments = %.4f" % statistic(measures["moments"]))
 
 # assignment functions
 
 # 1
-def network_models():
-    erdos = []
-    watts = []
-    barabasi = []
-    # generate 30 networks of each model
-    print("Generating networks...")
-    bar = progressbar.ProgressBar(max_value=30)
-    for i in range(30):
-        bar.update(i)
-        erdos.append(nx.erdos_renyi_graph(500, 0.1))
-        watts.append(nx.watts_strogatz_graph(1000, 10, 0.1))
-        barabasi.append(nx.barabasi_albert_graph(2000, 10))
-    bar.finish()
+def network_models(seed=0):
+    # one network of each model for the degree distribution plots
+    erdos = erdos_renyi(500, 0.1, seed)
+    watts = watts_strogatz(1000, 10, 0.1, seed)
+    barabasi = barabasi_albert(2000, 10, 1, seed)
 
     # degree distribution (one of each)
     print("Finding degree distributions...")
     dists = {}
-    dists["Erdös-Rényi"] = degree_distribution(erdos[0])
-    dists["Watts-Strogatz"] = degree_distribution(watts[0])
-    dists["Barabási-Albert"] = degree_distribution(barabasi[0])
+    dists["Erdös-Rényi"] = degree_distribution(erdos)
+    dists["Watts-Strogatz"] = degree_distribution(watts)
+    dists["Barabási-Albert"] = degree_distribution(barabasi)
 
     # plot
     print("Plotting...")
     sns.set()
 
     pp.title("Erdös-Rényi - Degree Distribution")
-    pp.hist(list(erdos[0].degree().values()), dists["Erdös-Rényi"], color=colors[0])
+    pp.bar(dists["Erdös-Rényi"].value, dists["Erdös-Rényi"].count, color=colors[0])
     pp.ylabel("Frequency")
     pp.xlabel("Degree (k)")
     pp.grid(False)
@@ -118,7 +114,7 @@ def network_models():
     pp.clf()
 
     pp.title("Watts-Strogatz - Degree Distribution")
-    pp.hist(list(watts[0].degree().values()), dists["Watts-Strogatz"], color=colors[1])
+    pp.bar(dists["Watts-Strogatz"].value, dists["Watts-Strogatz"].count, color=colors[1])
     pp.ylabel("Frequency")
     pp.xlabel("Degree (k)")
     pp.grid(False)
@@ -126,7 +122,7 @@ def network_models():
     pp.clf()
 
     pp.title("Barabási-Albert - Degree Distribution")
-    pp.hist(list(barabasi[0].degree().values()), dists["Barabási-Albert"], color=colors[2])
+    pp.bar(dists["Barabási-Albert"].value, dists["Barabási-Albert"].count, color=colors[2])
     pp.ylabel("Frequency")
     pp.xlabel("Degree (k)")
     pp.grid(False)
@@ -135,134 +131,37 @@ def network_models():
     print("Done plotting.")
 
     # table
+    # generate and measure 30 networks of each model across a process pool
     print("Taking measures...")
-    lens = {}
-    lens["erdos"] = []
-    lens["watts"] = []
-    lens["barabasi"] = []
-
-    degrees = {}
-    degrees["erdos"] = []
-    degrees["watts"] = []
-    degrees["barabasi"] = []
-
-    clusterings = {}
-    clusterings["erdos"] = []
-    clusterings["watts"] = []
-    clusterings["barabasi"] = []
-
-    assortativities = {}
-    assortativities["erdos"] = []
-    assortativities["watts"] = []
-    assortativities["barabasi"] = []
-
-    shortest_paths = {}
-    shortest_paths["erdos"] = []
-    shortest_paths["watts"] = []
-    shortest_paths["barabasi"] = []
-
-    entropies = {}
-    entropies["erdos"] = []
-    entropies["watts"] = []
-    entropies["barabasi"] = []
-
-    moments = {}
-    moments["erdos"] = []
-    moments["watts"] = []
-    moments["barabasi"] = []
-
-    print("Calculating Erdös-Rényi measurements...")
-    for graph in erdos:
-        lens["erdos"].append(len(graph))
-        degrees["erdos"].append(average_degree(graph))
-        clusterings["erdos"].append(nx.average_clustering(graph))
-        assortativities["erdos"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["erdos"].append(nx.average_shortest_path_length(graph))
-        entropies["erdos"].append(entropy(graph))
-        moments["erdos"].append(stat_moment(graph, 2))
-
-    print("Calculating Watts-Strogatz measurements...")
-    for graph in watts:
-        lens["watts"].append(len(graph))
-        degrees["watts"].append(average_degree(graph))
-        clusterings["watts"].append(nx.average_clustering(graph))
-        assortativities["watts"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["watts"].append(nx.average_shortest_path_length(graph))
-        entropies["watts"].append(entropy(graph))
-        moments["watts"].append(stat_moment(graph, 2))
-
-    print("Calculating Barabási-Albert measurements...")
-    for graph in barabasi:
-        lens["barabasi"].append(len(graph))
-        degrees["barabasi"].append(average_degree(graph))
-        clusterings["barabasi"].append(nx.average_clustering(graph))
-        assortativities["barabasi"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["barabasi"].append(nx.average_shortest_path_length(graph))
-        entropies["barabasi"].append(entropy(graph))
-        moments["barabasi"].append(stat_moment(graph, 2))
+    models = {}
+    models["erdos"] = partial(erdos_renyi, 500, 0.1)
+    models["watts"] = partial(watts_strogatz, 1000, 10, 0.1)
+    models["barabasi"] = partial(barabasi_albert, 2000, 10, 1)
+    measures = run_ensemble(models, 30, take_measures, seed=seed)
 
     print("Measurements for Erdös-Rényi networks")
     # median
     print("Median of...")
-    print("Number of nodes = %d" % np.median((lens["erdos"])))
-    print("Degrees = %.4f" % np.median((degrees["erdos"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["erdos"])))
-    print("Assortativity = %.4f" % np.median((assortativities["erdos"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["erdos"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["erdos"])))
-    print("Second stat moments = %.4f" % np.median((moments["erdos"])))
-
+    print_measures(measures["erdos"], median)
     # deviation
     print("Standard Deviation of...")
-    print("Number of nodes = %d" % np.std((lens["erdos"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["erdos"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["erdos"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["erdos"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["erdos"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["erdos"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["erdos"]), ddof=1))
+    print_measures(measures["erdos"], deviation)
 
     print("Measurements for Watts-Strogatz networks")
     # median
     print("Median of...")
-    print("Number of nodes = %d" % np.median((lens["watts"])))
-    print("Degrees = %.4f" % np.median((degrees["watts"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["watts"])))
-    print("Assortativity = %.4f" % np.median((assortativities["watts"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["watts"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["watts"])))
-    print("Second stat moments = %.4f" % np.median((moments["watts"])))
-
+    print_measures(measures["watts"], median)
     # deviation
     print("Standard Deviation of...")
-    print("Number of nodes = %d" % np.std((lens["watts"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["watts"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["watts"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["watts"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["watts"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["watts"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["watts"]), ddof=1))
+    print_measures(measures["watts"], deviation)
 
     print("Measurements for Barabási-Albert networks")
     # median
     print("Median of...")
-    print("Number of nodes = %d" % np.median((lens["barabasi"])))
-    print("Degrees = %.4f" % np.median((degrees["barabasi"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["barabasi"])))
-    print("Assortativity = %.4f" % np.median((assortativities["barabasi"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["barabasi"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["barabasi"])))
-    print("Second stat moments = %.4f" % np.median((moments["barabasi"])))
-
+    print_measures(measures["barabasi"], median)
     # deviation
     print("Standard Deviation of...")
-    print("Number of nodes = %d" % np.std((lens["barabasi"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["barabasi"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["barabasi"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["barabasi"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["barabasi"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["barabasi"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["barabasi"]), ddof=1))
+    print_measures(measures["barabasi"], deviation)
 
 # 2
 def ER_model():
@@ -275,7 +174,7 @@ def ER_model():
     for p in degrees:
         bar.update(p)
         # generate ER networks
-        current = nx.erdos_renyi_graph(1000, p)
+        current = erdos_renyi(1000, p)
         # store size of giant component for current p
         giants[p] = len(giant_component(current))
     bar.finish()
@@ -303,13 +202,17 @@ def WS_model():
 
     bar = progressbar.ProgressBar(max_value=1)
     print("Generating WS networks...")
+    # one pool for the BFS sources of every network in the sweep
+    pool = Pool()
     # generate WS networks
     for p in np.arange(0.0, 1.0, 0.001):
-        network = nx.watts_strogatz_graph(1000, 5, p)
-        clusterings.append(nx.average_clustering(network))
-        paths.append(nx.average_shortest_path_length(network))
+        graph = watts_strogatz(1000, 5, p)
+        clusterings.append(average_clustering(graph))
+        paths.append(average_shortest_path_length(graph, pool=pool))
         bar.update(p)
     bar.finish()
+    pool.close()
+    pool.join()
 
     # plot
     print("Plotting...")
@@ -339,216 +242,65 @@ def WS_model():
     pp.clf()
 
  # 4
-def BA_model():
-    barabasi05 = []
-    barabasi10 = []
-    barabasi15 = []
-    barabasi20 = []
-    # generate 30 networks, do the same as one
-    for i in range(10):
-        #generate Barabasi network with p = power
-        barabasi05.append(ig_to_nx(ig.Graph.Barabasi(500, 10, power=0.5)))
-        barabasi10.append(ig_to_nx(ig.Graph.Barabasi(500, 10, power=1)))
-        barabasi15.append(ig_to_nx(ig.Graph.Barabasi(500, 10, power=1.5)))
-        barabasi20.append(ig_to_nx(ig.Graph.Barabasi(500, 10, power=2)))
-
-    print("Finding degree distributions...")
-    dists = {}
-    dists["barabasi05"] = degree_distribution(barabasi05[0])
-    dists["barabasi10"] = degree_distribution(barabasi10[0])
-    dists["barabasi15"] = degree_distribution(barabasi15[0])
-    dists["barabasi20"] = degree_distribution(barabasi20[0])
+def BA_model(seed=0):
+    # generate 10 networks of each power, measured across a process pool
+    models = {}
+    models["barabasi05"] = partial(barabasi_albert, 500, 10, 0.5)
+    models["barabasi10"] = partial(barabasi_albert, 500, 10, 1)
+    models["barabasi15"] = partial(barabasi_albert, 500, 10, 1.5)
+    models["barabasi20"] = partial(barabasi_albert, 500, 10, 2)
 
     # table
     print("Taking measures...")
-
-    lens = {}
-    lens["barabasi05"] = []
-    lens["barabasi10"] = []
-    lens["barabasi15"] = []
-    lens["barabasi20"] = []
-
-    degrees = {}
-    degrees["barabasi05"] = []
-    degrees["barabasi10"] = []
-    degrees["barabasi15"] = []
-    degrees["barabasi20"] = []
-
-    clusterings = {}
-    clusterings["barabasi05"] = []
-    clusterings["barabasi10"] = []
-    clusterings["barabasi15"] = []
-    clusterings["barabasi20"] = []
-
-    assortativities = {}
-    assortativities["barabasi05"] = []
-    assortativities["barabasi10"] = []
-    assortativities["barabasi15"] = []
-    assortativities["barabasi20"] = []
-
-    shortest_paths = {}
-    shortest_paths["barabasi05"] = []
-    shortest_paths["barabasi10"] = []
-    shortest_paths["barabasi15"] = []
-    shortest_paths["barabasi20"] = []
-
-    entropies = {}
-    entropies["barabasi05"] = []
-    entropies["barabasi10"] = []
-    entropies["barabasi15"] = []
-    entropies["barabasi20"] = []
-
-    moments = {}
-    moments["barabasi05"] = []
-    moments["barabasi10"] = []
-    moments["barabasi15"] = []
-    moments["barabasi20"] = []
-
-    for graph in barabasi05:
-        lens["barabasi05"].append(len(graph))
-        degrees["barabasi05"].append(average_degree(graph))
-        clusterings["barabasi05"].append(nx.average_clustering(graph))
-        assortativities["barabasi05"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["barabasi05"].append(nx.average_shortest_path_length(graph))
-        entropies["barabasi05"].append(entropy(graph))
-        moments["barabasi05"].append(stat_moment(graph, 2))
-
-    for graph in barabasi10:
-        lens["barabasi10"].append(len(graph))
-        degrees["barabasi10"].append(average_degree(graph))
-        clusterings["barabasi10"].append(nx.average_clustering(graph))
-        assortativities["barabasi10"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["barabasi10"].append(nx.average_shortest_path_length(graph))
-        entropies["barabasi10"].append(entropy(graph))
-        moments["barabasi10"].append(stat_moment(graph, 2))
-
-    for graph in barabasi15:
-        lens["barabasi15"].append(len(graph))
-        degrees["barabasi15"].append(average_degree(graph))
-        clusterings["barabasi15"].append(nx.average_clustering(graph))
-        assortativities["barabasi15"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["barabasi15"].append(nx.average_shortest_path_length(graph))
-        entropies["barabasi15"].append(entropy(graph))
-        moments["barabasi15"].append(stat_moment(graph, 2))
-
-    for graph in barabasi20:
-        lens["barabasi20"].append(len(graph))
-        degrees["barabasi20"].append(average_degree(graph))
-        clusterings["barabasi20"].append(nx.average_clustering(graph))
-        assortativities["barabasi20"].append(nx.degree_assortativity_coefficient(graph))
-        shortest_paths["barabasi20"].append(nx.average_shortest_path_length(graph))
-        entropies["barabasi20"].append(entropy(graph))
-        moments["barabasi20"].append(stat_moment(graph, 2))
+    measures = run_ensemble(models, 10, take_measures, seed=seed)
 
     print("Calculating Barabási-Albert measurements for alfa = 0.5...")
     # median
     print("Median of Barabasi alfa = 0.5")
-    print("Number of nodes = %d" % np.median((lens["barabasi05"])))
-    print("Degrees = %.4f" % np.median((degrees["barabasi05"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["barabasi05"])))
-    print("Assortativity = %.4f" % np.median((assortativities["barabasi05"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["barabasi05"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["barabasi05"])))
-    print("Second stat moments = %.4f" % np.median((moments["barabasi05"])))
-
+    print_measures(measures["barabasi05"], median)
     # deviation
     print("Standard Deviation of Barabasi alfa = 0.5")
-    print("Number of nodes = %d" % np.std((lens["barabasi05"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["barabasi05"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["barabasi05"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["barabasi05"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["barabasi05"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["barabasi05"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["barabasi05"]), ddof=1))
+    print_measures(measures["barabasi05"], deviation)
 
     print("Calculating Barabási-Albert measurements for alfa = 1.0...")
     # median
     print("Median of Barabasi alfa = 1.0")
-    print("Number of nodes = %d" % np.median((lens["barabasi10"])))
-    print("Degrees = %.4f" % np.median((degrees["barabasi10"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["barabasi10"])))
-    print("Assortativity = %.4f" % np.median((assortativities["barabasi10"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["barabasi10"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["barabasi10"])))
-    print("Second stat moments = %.4f" % np.median((moments["barabasi10"])))
-
+    print_measures(measures["barabasi10"], median)
     # deviation
     print("Standard Deviation of Barabasi alfa = 1.0")
-    print("Number of nodes = %d" % np.std((lens["barabasi10"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["barabasi10"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["barabasi10"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["barabasi10"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["barabasi10"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["barabasi10"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["barabasi10"]), ddof=1))
+    print_measures(measures["barabasi10"], deviation)
 
     print("Calculating Barabási-Albert measurements for alfa = 1.5...")
     # median
     print("Median of Barabasi alfa = 1.5")
-    print("Number of nodes = %d" % np.median((lens["barabasi15"])))
-    print("Degrees = %.4f" % np.median((degrees["barabasi15"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["barabasi15"])))
-    print("Assortativity = %.4f" % np.median((assortativities["barabasi15"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["barabasi15"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["barabasi15"])))
-    print("Second stat moments = %.4f" % np.median((moments["barabasi15"])))
-
+    print_measures(measures["barabasi15"], median)
     # deviation
     print("Standard Deviation of Barabasi alfa = 1.5")
-    print("Number of nodes = %d" % np.std((lens["barabasi15"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["barabasi15"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["barabasi15"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["barabasi15"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["barabasi15"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["barabasi15"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["barabasi15"]), ddof=1))
+    print_measures(measures["barabasi15"], deviation)
 
     print("Calculating Barabási-Albert measurements for alfa = 2.0...")
     # median
     print("Median of Barabasi alfa = 2.0")
-    print("Number of nodes = %d" % np.median((lens["barabasi20"])))
-    print("Degrees = %.4f" % np.median((degrees["barabasi20"])))
-    print("Clustering coefficient = %.4f" % np.median((clusterings["barabasi20"])))
-    print("Assortativity = %.4f" % np.median((assortativities["barabasi20"])))
-    print("Shortest paths = %.4f" % np.median((shortest_paths["barabasi20"])))
-    print("Shannon entropies = %.4f" % np.median((entropies["barabasi20"])))
-    print("Second stat moments = %.4f" % np.median((moments["barabasi20"])))
-
+    print_measures(measures["barabasi20"], median)
     # deviation
     print("Standard Deviation of Barabasi alfa = 2.0")
-    print("Number of nodes = %d" % np.std((lens["barabasi20"]), ddof=1))
-    print("Degrees = %.4f" % np.std((degrees["barabasi20"]), ddof=1))
-    print("Clustering coefficient = %.4f" % np.std((clusterings["barabasi20"]), ddof=1))
-    print("Assortativity = %.4f" % np.std((assortativities["barabasi20"]), ddof=1))
-    print("Shortest paths = %.4f" % np.std((shortest_paths["barabasi20"]), ddof=1))
-    print("Shannon entropies = %.4f" % np.std((entropies["barabasi20"]), ddof=1))
-    print("Second stat moments = %.4f" % np.std((moments["barabasi20"]), ddof=1))
+    print_measures(measures["barabasi20"], deviation)
 
 # # 5
 def stress_test():
-    # random removals
-    lens = {}
-    erdos = nx.erdos_renyi_graph(500, 0.1)
-    lens["erdos"] = len(erdos)
-    barabasi = nx.barabasi_albert_graph(2000, 10)
-    lens["barabasi"] = len(barabasi)
+    # the giant component curves are replayed in reverse with a union-find
+    # (complexnets.percolation) instead of recomputed after every removal
+    erdos = erdos_renyi(500, 0.1)
+    barabasi = barabasi_albert(2000, 10)
 
+    # random removals
     giant_sizes = {}
-    giant_sizes["erdos"] = []
-    giant_sizes["barabasi"] = []
-
-    while (len(erdos) > 1):
-        erdos.remove_node(erdos.nodes()[random.randint(0,len(erdos)-1)])
-        giant_sizes["erdos"].append(len(giant_component(erdos)))
-
-    while (len(barabasi) > 1):
-        # remove vertex
-        barabasi.remove_node(barabasi.nodes()[random.randint(0,len(barabasi)-1)])
-        giant_sizes["barabasi"].append(len(giant_component(barabasi)))
+    giant_sizes["erdos"] = failure_curve(erdos)
+    giant_sizes["barabasi"] = failure_curve(barabasi)
 
     # plot stress test
     sns.set()
-    pp.plot(lens["erdos"], giant_sizes["erdos"], color=colors[0])
+    pp.plot(np.arange(len(giant_sizes["erdos"])), giant_sizes["erdos"], color=colors[0])
     pp.xlabel("Number of removals")
     pp.ylabel("Size of giant component")
     pp.grid(False)
@@ -556,7 +308,7 @@ def stress_test():
     pp.clf()
 
     sns.set()
-    pp.plot(lens["barabasi"], giant_sizes["barabasi"], color=colors[0])
+    pp.plot(np.arange(len(giant_sizes["barabasi"])), giant_sizes["barabasi"], color=colors[0])
     pp.xlabel("Number of removals")
     pp.ylabel("Size of giant component")
     pp.grid(False)
@@ -564,36 +316,13 @@ def stress_test():
     pp.clf()
 
     # remove from most connected to least connected
-    lens.clear()
-    erdos = nx.erdos_renyi_graph(500, 0.1)
-    lens["erdos"] = len(erdos)
-    barabasi = nx.barabasi_albert_graph(2000, 10)
-    lens["barabasi"] = len(barabasi)
-
-    erdos_sorted = sorted(erdos.degree_iter(),key=itemgetter(1),reverse=True)
-    barabasi_nodes = sorted(erdos.degree_iter(),key=itemgetter(1),reverse=True)
-
     giant_sizes.clear()
-    giant_sizes["erdos"] = []
-    giant_sizes["barabasi"] = []
-    
-    i = 0
-    while (len(erdos) > 1):
-        # remove vertex
-        erdos.remove_node(erdos_sorted[i])
-        giant_sizes["erdos"].append(len(giant_component(erdos)))
-        i += 1
-
-    i = 0
-    while (len(barabasi) > 1):
-        # remove vertex
-        barabasi.remove_node(barabasi_sorted[i])
-        giant_sizes["barabasi"].append(len(giant_component(barabasi)))
-        i += 1
+    giant_sizes["erdos"] = attack_curve(erdos)
+    giant_sizes["barabasi"] = attack_curve(barabasi)
 
     # plot stress test
     sns.set()
-    pp.plot(lens["erdos"], giant_sizes["erdos"], color=colors[0])
+    pp.plot(np.arange(len(giant_sizes["erdos"])), giant_sizes["erdos"], color=colors[0])
     pp.xlabel("Number of removals")
     pp.ylabel("Size of giant component")
     pp.grid(False)
@@ -601,13 +330,34 @@ def stress_test():
     pp.clf()
 
     sns.set()
-    pp.plot(lens["barabasi"], giant_sizes["barabasi"], color=colors[0])
+    pp.plot(np.arange(len(giant_sizes["barabasi"])), giant_sizes["barabasi"], color=colors[0])
     pp.xlabel("Number of removals")
     pp.ylabel("Size of giant component")
     pp.grid(False)
     pp.savefig('plots/BA-stress-test-sorted.png')
     pp.clf()
 
+    # always remove the currently most connected vertex
+    giant_sizes.clear()
+    giant_sizes["erdos"] = attack_curve(erdos, adaptive=True)
+    giant_sizes["barabasi"] = attack_curve(barabasi, adaptive=True)
+
+    # plot stress test
+    sns.set()
+    pp.plot(np.arange(len(giant_sizes["erdos"])), giant_sizes["erdos"], color=colors[0])
+    pp.xlabel("Number of removals")
+    pp.ylabel("Size of giant component")
+    pp.grid(False)
+    pp.savefig('plots/ER-stress-test-adaptive.png')
+    pp.clf()
+
+    sns.set()
+    pp.plot(np.arange(len(giant_sizes["barabasi"])), giant_sizes["barabasi"], color=colors[0])
+    pp.xlabel("Number of removals")
+    pp.ylabel("Size of giant component")
+    pp.grid(False)
+    pp.savefig('plots/BA-stress-test-adaptive.png')
+    pp.clf()
 
 def main():
     network_models()
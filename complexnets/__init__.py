@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+'''
+Shared graph core for the Complex Networks assignments.
+
+Graphs are stored as compressed sparse rows (CSR): an offsets array of
+length N + 1 and a neighbors array of length 2M, so that the neighbors of
+node i are neighbors[offsets[i]:offsets[i + 1]].
+'''
+
+from .graph import Graph
+from .components import connected_components, giant_component, giant_mask
+from .loader import read_columns, read_edgelist, read_graph
+from .cache import load_graph
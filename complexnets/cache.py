@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+'''
+On-disk cache of parsed graphs.
+
+Each edge-list file gets an entry in a __graphcache__ directory next to it,
+holding the CSR arrays of the full graph and of its giant component as .npy
+files (plus the edge weights for weighted loads, in separate entries).
+Entries are keyed by the SHA-1 of the file contents, so editing the file
+invalidates them; warm loads memory-map the arrays instead of parsing.
+'''
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .components import giant_component
+from .graph import Graph
+from .loader import read_graph
+
+CACHE_DIR = '__graphcache__'
+HASH_BLOCK = 1 << 20
+ARRAYS = ('offsets', 'neighbors', 'labels')
+WEIGHTED_SUFFIX = '-weighted'
+
+
+def file_hash(filename):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_hash(filename, cache_dir):
+    '''
+    Content hash of filename, reusing the last one computed while the file
+    size and modification time are unchanged.
+    '''
+    stat = os.stat(filename)
+    stamp = '%d %d' % (stat.st_size, stat.st_mtime_ns)
+    index = os.path.join(cache_dir, os.path.basename(filename) + '.key')
+    if os.path.exists(index):
+        with open(index) as f:
+            saved_stamp, _, saved_hash = f.read().strip().rpartition(' ')
+        if saved_stamp == stamp:
+            return saved_hash
+
+    digest = file_hash(filename)
+    with open(index, 'w') as f:
+        f.write('%s %s\n' % (stamp, digest))
+    return digest
+
+
+def _arrays(weighted):
+    return ARRAYS + ('weights',) if weighted else ARRAYS
+
+
+def _save(graph, directory, name, weighted):
+    for array in _arrays(weighted):
+        np.save(os.path.join(directory, '%s-%s.npy' % (name, array)), getattr(graph, array))
+
+
+def _load(directory, name, weighted):
+    arrays = [np.load(os.path.join(directory, '%s-%s.npy' % (name, array)), mmap_mode='r')
+              for array in _arrays(weighted)]
+    return Graph(*arrays)
+
+
+def load_graph(filename, cache_dir=None, weighted=False):
+    '''
+    Return (graph, giant component) for an edge-list file, parsing it only
+    when no cache entry matches its current contents. With weighted, the
+    third column is loaded as graph.weights (see read_graph).
+    '''
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIR)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    base = os.path.basename(filename)
+    suffix = WEIGHTED_SUFFIX if weighted else ''
+    entry = os.path.join(cache_dir, '%s-%s%s' % (base, _source_hash(filename, cache_dir), suffix))
+    if os.path.isdir(entry):
+        return _load(entry, 'graph', weighted), _load(entry, 'giant', weighted)
+
+    graph = read_graph(filename, weighted)
+    giant = giant_component(graph)
+
+    # write into a scratch directory and rename, so readers never see a
+    # half-written entry
+    scratch = tempfile.mkdtemp(dir=cache_dir)
+    _save(graph, scratch, 'graph', weighted)
+    _save(giant, scratch, 'giant', weighted)
+    # older entries of the same kind (weighted or not) for this file
+    for stale in os.listdir(cache_dir):
+        if stale.startswith(base + '-') and stale.endswith(WEIGHTED_SUFFIX) == weighted:
+            shutil.rmtree(os.path.join(cache_dir, stale), ignore_errors=True)
+    try:
+        os.rename(scratch, entry)
+    except OSError:
+        # another process stored the same entry first
+        shutil.rmtree(scratch, ignore_errors=True)
+    return _load(entry, 'graph', weighted), _load(entry, 'giant', weighted)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+'''
+Centrality measures over the CSR graph.
+'''
+
+from multiprocessing import cpu_count
+
+import numpy as np
+from scipy.sparse import block_diag
+
+from .ensemble import map_tasks
+
+
+def _dependencies(offsets, neighbors, source, n):
+    '''
+    Brandes' single-source pass: BFS level by level counting shortest
+    paths, then accumulate pair dependencies back along the BFS DAG.
+    '''
+    distance = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    distance[source] = 0
+    sigma[source] = 1
+    frontier = np.array([source])
+    dag = []
+    level = 0
+    while len(frontier):
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = counts.sum()
+        if not total:
+            break
+        tails = np.repeat(frontier, counts)
+        heads = neighbors[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)]
+
+        unseen = heads[distance[heads] < 0]
+        distance[unseen] = level + 1
+        forward = distance[heads] == level + 1
+        tails = tails[forward]
+        heads = heads[forward]
+        np.add.at(sigma, heads, sigma[tails])
+        dag.append((tails, heads))
+        frontier = np.unique(heads)
+        level += 1
+
+    delta = np.zeros(n)
+    for tails, heads in reversed(dag):
+        np.add.at(delta, tails, sigma[tails] / sigma[heads] * (1 + delta[heads]))
+    delta[source] = 0
+    return delta
+
+
+def _block_dependencies(task):
+    offsets, neighbors, sources = task
+    n = len(offsets) - 1
+    total = np.zeros(n)
+    for source in sources.tolist():
+        total += _dependencies(offsets, neighbors, source, n)
+    return total
+
+
+def betweenness_samples(n, epsilon, delta):
+    '''
+    Number of uniform source samples after which every node's normalized
+    betweenness is within epsilon of the truth with probability 1 - delta
+    (Hoeffding's bound on dependencies scaled to [0, 1], union bound over
+    the n nodes).
+    '''
+    # normalized betweenness is n / (n - 1) times the mean scaled dependency
+    epsilon = epsilon * (n - 1) / n
+    return int(np.ceil(np.log(2 * n / delta) / (2 * epsilon ** 2)))
+
+
+def betweenness_centrality(graph, epsilon=None, delta=0.1, normalized=True,
+                           seed=None, processes=None, pool=None):
+    '''
+    Betweenness of every node, as an array indexed by node, matching
+    networkx's betweenness_centrality for undirected graphs.
+
+    With epsilon set, only a uniform sample of sources is expanded (Brandes
+    & Pich) and their dependencies are scaled up by n / samples; the
+    normalized values are then within epsilon of the exact ones with
+    probability at least 1 - delta. Falls back to the exact computation
+    when that would need at least n sources. Blocks of sources run through
+    ensemble.map_tasks.
+    '''
+    n = graph.number_of_nodes()
+    sources = np.arange(n)
+    if epsilon is not None:
+        samples = betweenness_samples(n, epsilon, delta)
+        if samples < n:
+            sources = np.random.default_rng(seed).integers(0, n, size=samples)
+    processes = processes or cpu_count()
+
+    # about four blocks of sources per process
+    size = max(1, -(-len(sources) // (4 * processes)))
+    tasks = [(graph.offsets, graph.neighbors, sources[start:start + size])
+             for start in range(0, len(sources), size)]
+    blocks = map_tasks(_block_dependencies, tasks, processes, pool)
+
+    betweenness = np.sum(blocks, axis=0) if blocks else np.zeros(n)
+    betweenness *= n / max(len(sources), 1)
+    if normalized:
+        if n > 2:
+            betweenness /= (n - 1) * (n - 2)
+    else:
+        # every unordered pair was counted from both ends
+        betweenness /= 2
+    return betweenness
+
+
+def _batch(graphs, start):
+    '''
+    Stack one graph, or a list of them, into a single block-diagonal
+    adjacency so every power iteration is one sparse product for all.
+    Returns the matrix, the first node of every graph and the starting
+    vectors concatenated in the same order (None where not given).
+    '''
+    single = not isinstance(graphs, (list, tuple))
+    if single:
+        graphs = [graphs]
+        start = [start]
+    elif start is None:
+        start = [None] * len(graphs)
+    sizes = np.array([graph.number_of_nodes() for graph in graphs])
+    firsts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    if len(graphs) == 1:
+        adjacency = graphs[0].adjacency()
+    else:
+        adjacency = block_diag([graph.adjacency() for graph in graphs], format='csr')
+    return single, adjacency, sizes, firsts, start
+
+
+def _split(single, x, sizes, firsts):
+    parts = [x[first:first + size] for first, size in zip(firsts, sizes)]
+    return parts[0] if single else parts
+
+
+def _iterate(step, x, firsts, tol, max_iter):
+    '''
+    Apply step until, for every graph and column, the L1 change is below
+    size * tol (networkx's criterion); converged blocks are frozen.
+    '''
+    sizes = np.diff(np.append(firsts, len(x)))
+    active = np.ones((len(firsts),) + x.shape[1:], dtype=bool)
+    for _ in range(max_iter):
+        last = x
+        x = step(x)
+        rows = np.repeat(active, sizes, axis=0)
+        x = np.where(rows, x, last)
+        change = np.add.reduceat(np.abs(x - last), firsts, axis=0)
+        active &= change >= (sizes * tol).reshape((-1,) + (1,) * (x.ndim - 1))
+        if not active.any():
+            return x
+    raise RuntimeError('power iteration failed to converge in %d iterations' % max_iter)
+
+
+def eigenvector_centrality(graph, start=None, max_iter=1000, tol=1e-6):
+    '''
+    Eigenvector centrality by power iteration on A + I with the CSR
+    adjacency, matching networkx's eigenvector_centrality (unit Euclidean
+    norm per graph).
+
+    graph may be a list of graphs, iterated together as one block-diagonal
+    matrix; a list of arrays comes back. start warm-starts the iteration,
+    typically from the result on a slightly different graph (one array, or
+    one per graph with None for the default).
+    '''
+    single, adjacency, sizes, firsts, start = _batch(graph, start)
+    x = np.concatenate([np.ones(size) if vector is None else
+                        np.asarray(vector, dtype=np.float64)
+                        for size, vector in zip(sizes, start)])
+    if not len(x):
+        return _split(single, x, sizes, firsts)
+
+    def step(x):
+        x = x + adjacency @ x
+        norms = np.sqrt(np.add.reduceat(x * x, firsts))
+        norms[norms == 0] = 1
+        return x / np.repeat(norms, sizes)
+
+    return _split(single, _iterate(step, x, firsts, tol, max_iter), sizes, firsts)
+
+
+def pagerank(graph, alpha=0.85, start=None, max_iter=100, tol=1e-6):
+    '''
+    PageRank by power iteration with the CSR adjacency, matching networkx's
+    pagerank with uniform teleportation; dangling nodes spread their rank
+    uniformly over their own graph.
+
+    alpha may be a sequence of damping factors, all iterated together as
+    columns of one matrix; each result then has one column per factor.
+    graph may be a list of graphs and start a warm start, as in
+    eigenvector_centrality.
+    '''
+    single, adjacency, sizes, firsts, start = _batch(graph, start)
+    alphas = np.atleast_1d(np.asarray(alpha, dtype=np.float64))
+    x = np.concatenate([np.full((size, len(alphas)), 1 / size) if vector is None else
+                        np.broadcast_to(np.asarray(vector, dtype=np.float64).reshape(size, -1),
+                                        (size, len(alphas)))
+                        for size, vector in zip(sizes, start)])
+    if not len(x):
+        return _split(single, x, sizes, firsts)
+    x = x / np.repeat(np.add.reduceat(x, firsts, axis=0), sizes, axis=0)
+
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = degree == 0
+    inverse = np.zeros_like(degree)
+    inverse[~dangling] = 1 / degree[~dangling]
+    share = np.repeat(1 / sizes, sizes)[:, None]
+
+    def step(x):
+        lost = np.add.reduceat(x * dangling[:, None], firsts, axis=0)
+        spread = np.repeat(alphas * lost + (1 - alphas), sizes, axis=0)
+        return alphas * (adjacency @ (x * inverse[:, None])) + spread * share
+
+    x = _iterate(step, x, firsts, tol, max_iter)
+    if np.ndim(alpha) == 0:
+        x = x[:, 0]
+    return _split(single, x, sizes, firsts)
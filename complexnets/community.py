@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+
+'''
+Community structure over the CSR graph.
+
+A dendrogram is a sequence of merges in igraph's convention: with N nodes,
+merge s joins clusters a and b (nodes are 0..N-1, the cluster made by
+merge t is N + t) into cluster N + s. Merging A and B changes modularity
+by
+
+    dQ = e_AB / M - 2 d_A d_B / (2M)^2
+
+with e_AB the edges between them and d the total degrees, so the whole
+trajectory follows from e_AB and d per merge. An edge first becomes
+internal at the merge that is the lowest common ancestor of its endpoints;
+all those ancestors are found at once by binary lifting on the merge tree.
+
+Louvain and Leiden work on the weighted adjacency matrix of each level of
+aggregation. A round of local moves evaluates every active node at once:
+its links to every neighbouring community are one sparse product A S with
+the community indicator S (for short rows, its columns relabelled by
+community with the duplicates summed), and each node picks the community
+with the largest gain. Moving all improving nodes together can swap two
+nodes back and forth forever, so each one moves with probability
+MOVE_PROBABILITY, drawn from the seeded generator, and less often when a
+round of moves would not raise modularity. Rows are split in blocks
+evaluated by a thread pool (the sparse routines and array operations
+release the GIL); blocks only split the work, so the result does not
+depend on the number of threads. Aggregation is the product S^T A S.
+'''
+
+from functools import partial
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+# chance that a node with a positive gain moves in a round of local moves
+MOVE_PROBABILITY = 0.5
+
+# smallest modularity gain that counts as an improvement
+GAIN_TOLERANCE = 1e-10
+
+# mean row length below which summing duplicates beats the sparse product
+SHORT_ROWS = 64
+
+# rounds of local moves per level, a guard against slow convergence
+MAX_ROUNDS = 200
+
+
+def _lifting(parent):
+    '''
+    Depth of every node of a forest given by parent (roots point to
+    themselves) and the table of 2^k-th ancestors, by pointer jumping.
+    '''
+    up = [parent]
+    depth = (parent != np.arange(len(parent))).astype(np.int64)
+    ancestor = parent
+    while True:
+        jumped = ancestor[ancestor]
+        if np.array_equal(jumped, ancestor):
+            return depth, up
+        depth = depth + depth[ancestor]
+        ancestor = jumped
+        up.append(ancestor)
+
+
+def _common_ancestors(parent, depth, up, u, v):
+    '''lowest common ancestor of every pair (u, v); -1 where none'''
+    # lift the deeper endpoint to the depth of the other
+    swap = depth[u] < depth[v]
+    u, v = np.where(swap, v, u), np.where(swap, u, v)
+    gap = depth[u] - depth[v]
+    for k, ancestor in enumerate(up):
+        lift = (gap >> k) & 1 == 1
+        u = np.where(lift, ancestor[u], u)
+    same = u == v
+    for ancestor in reversed(up):
+        differ = ancestor[u] != ancestor[v]
+        u = np.where(differ, ancestor[u], u)
+        v = np.where(differ, ancestor[v], v)
+    common = np.where(same, u, parent[u])
+    # endpoints in different trees never merge
+    return np.where(same | (parent[u] == parent[v]) & (u != v), common, -1)
+
+
+def merge_modularity(graph, merges):
+    '''
+    Modularity of the partition after each prefix of merges: entry s is the
+    modularity once the first s merges are applied (N - s communities, the
+    singletons at s = 0), for len(merges) + 1 entries in total.
+    '''
+    n = graph.number_of_nodes()
+    merges = np.asarray(merges, dtype=np.int64).reshape(-1, 2)
+    steps = len(merges)
+    m = graph.number_of_edges()
+    degree = graph.degree().astype(np.float64)
+    if not m:
+        return np.zeros(steps + 1)
+
+    # total degree of every cluster, children always made before parents
+    total = degree.tolist() + [0.0] * steps
+    for step, (a, b) in enumerate(merges.tolist()):
+        total[n + step] = total[a] + total[b]
+    total = np.array(total)
+
+    parent = np.arange(n + steps)
+    parent[merges[:, 0]] = n + np.arange(steps)
+    parent[merges[:, 1]] = n + np.arange(steps)
+    depth, up = _lifting(parent)
+    u, v = graph.edges()
+    common = _common_ancestors(parent, depth, up, u.astype(np.int64), v.astype(np.int64))
+    between = np.bincount(common[common >= 0] - n, minlength=steps)
+
+    change = between / m - 2 * total[merges[:, 0]] * total[merges[:, 1]] / (2.0 * m) ** 2
+    start = -np.sum((degree / (2.0 * m)) ** 2)
+    return start + np.concatenate(([0.0], np.cumsum(change)))
+
+
+def modularity(graph, membership):
+    '''modularity of a partition given as one community label per node'''
+    membership = np.asarray(membership, dtype=np.int64)
+    m = graph.number_of_edges()
+    if not m:
+        return 0.0
+    internal = np.sum(membership[graph.sources()] == membership[graph.neighbors]) / 2
+    totals = np.bincount(membership, weights=graph.degree())
+    return internal / m - np.sum((totals / (2.0 * m)) ** 2)
+
+
+def _indicator(label, size):
+    '''sparse (nodes x size) matrix with a one at (i, label[i])'''
+    n = len(label)
+    return csr_matrix((np.ones(n), label, np.arange(n + 1)), shape=(n, size))
+
+
+def _compact(label):
+    '''relabel to 0..C-1, keeping the order of the labels'''
+    used = np.bincount(label) > 0
+    return (np.cumsum(used) - 1)[label]
+
+
+def _serial_map(function, tasks):
+    return [function(task) for task in tasks]
+
+
+def _candidates(adjacency, label, strength, totals, scale, priority, rows):
+    '''
+    Best community for each of rows and its gain over staying; the gains are
+    in units of edge weight, scale is resolution / (2M). Ties go to the
+    community of highest priority.
+    '''
+    links = adjacency[rows]
+    if links.nnz < SHORT_ROWS * len(rows):
+        # short rows: relabel the columns and sum the duplicates in place
+        links = csr_matrix((links.data, label[links.indices], links.indptr),
+                           shape=(len(rows), len(label)))
+        links.sum_duplicates()
+    else:
+        links = links @ _indicator(label, len(label))
+    if not links.nnz:
+        return rows[:0], rows[:0], np.zeros(0)
+    community, weight, sizes = links.indices, links.data, np.diff(links.indptr)
+    strength = strength[rows]
+    own = community == np.repeat(label[rows], sizes)
+    gain = weight - np.repeat(scale * strength, sizes) * totals[community]
+    gain[own] = -np.inf
+
+    # removing a node from its community: the links it keeps there and the
+    # expected ones, without its own strength
+    stay = -scale * strength * (totals[label[rows]] - strength)
+    owned = np.flatnonzero(own)
+    stay[np.searchsorted(links.indptr, owned, side='right') - 1] += weight[owned]
+
+    # the best entries of every row, then the one of highest priority
+    filled = sizes > 0
+    best = np.full(len(rows), -np.inf)
+    best[filled] = np.maximum.reduceat(gain, links.indptr[:-1][filled])
+    hits = np.flatnonzero(gain == np.repeat(best, sizes))
+    row = np.searchsorted(links.indptr, hits, side='right') - 1
+    first = np.flatnonzero(np.concatenate(([True], row[1:] != row[:-1])))
+    rank = priority[community[hits]]
+    top = np.repeat(np.maximum.reduceat(rank, first), np.diff(np.append(first, len(hits))))
+    hits, row = hits[rank == top], row[rank == top]
+    keep = np.concatenate(([True], row[1:] != row[:-1]))
+    hits, row = hits[keep], row[keep]
+    return rows[row], community[hits], gain[hits] - stay[row]
+
+
+def _round_gain(adjacency, label, strength, totals, scale, nodes, targets):
+    '''
+    Exact change of modularity (times 2M) when nodes move to targets all at
+    once, and the community totals after the moves.
+    '''
+    moved = np.zeros(len(label), dtype=bool)
+    moved[nodes] = True
+    after = label.copy()
+    after[nodes] = targets
+    links = adjacency[nodes]
+    source = np.repeat(nodes, np.diff(links.indptr))
+    change = ((after[source] == after[links.indices]).astype(np.float64)
+              - (label[source] == label[links.indices]))
+    # an edge to a node that stays only shows up in the row of the mover
+    internal = np.sum(links.data * change * np.where(moved[links.indices], 1, 2))
+    updated = (totals - np.bincount(label[nodes], weights=strength[nodes], minlength=len(label))
+               + np.bincount(targets, weights=strength[nodes], minlength=len(label)))
+    return internal - scale * (np.dot(updated, updated) - np.dot(totals, totals)), updated
+
+
+def _local_moves(adjacency, strength, label, scale, rng, mapper, blocks,
+                 singletons=False):
+    '''
+    Rounds of local moves from label until no node improves; with
+    singletons, only nodes alone in their community move.
+
+    The gains of nodes moving together do not add up when they join or
+    leave the same communities; a round that would lower modularity is
+    drawn again with half the move probability (the best mover always
+    moves, so some round improves).
+    '''
+    n = len(label)
+    label = label.copy()
+    totals = np.bincount(label, weights=strength, minlength=n)
+    active = np.arange(n)
+    probability = MOVE_PROBABILITY
+    threshold = GAIN_TOLERANCE / scale if scale else GAIN_TOLERANCE
+    for _ in range(MAX_ROUNDS):
+        if singletons:
+            active = active[np.bincount(label, minlength=n)[label[active]] == 1]
+        if not len(active):
+            break
+        evaluate = partial(_candidates, adjacency, label, strength, totals, scale,
+                           rng.random(n))
+        found = mapper(evaluate, np.array_split(active, min(blocks, len(active))))
+        nodes = np.concatenate([block[0] for block in found])
+        targets = np.concatenate([block[1] for block in found])
+        gains = np.concatenate([block[2] for block in found])
+        improves = gains > threshold
+        if not improves.any():
+            break
+        nodes, targets, gains = nodes[improves], targets[improves], gains[improves]
+        while True:
+            move = rng.random(len(nodes)) < probability
+            move[np.argmax(gains)] = True
+            gain, updated = _round_gain(adjacency, label, strength, totals, scale,
+                                        nodes[move], targets[move])
+            if gain > threshold or move.sum() == 1:
+                break
+            probability /= 2
+        probability = min(2 * probability, MOVE_PROBABILITY)
+        waiting = nodes[~move]
+        nodes, targets = nodes[move], targets[move]
+        totals = updated
+        label[nodes] = targets
+        # the improvers left waiting and, as in Leiden, the neighbours of the
+        # moved nodes outside their new communities
+        links = adjacency[nodes]
+        outside = label[links.indices] != np.repeat(targets, np.diff(links.indptr))
+        touched = np.zeros(n, dtype=bool)
+        touched[links.indices[outside]] = True
+        touched[waiting] = True
+        active = np.flatnonzero(touched)
+    return label
+
+
+def _within(adjacency, label):
+    '''adjacency restricted to the links inside communities'''
+    n = adjacency.shape[0]
+    rows = np.repeat(np.arange(n), np.diff(adjacency.indptr))
+    inside = label[rows] == label[adjacency.indices]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[inside], minlength=n), out=indptr[1:])
+    return csr_matrix((adjacency.data[inside], adjacency.indices[inside], indptr),
+                      shape=adjacency.shape)
+
+
+def _split_disconnected(graph, membership):
+    '''
+    Communities split into their connected components, which only raises
+    modularity: the internal edges stay, the expected ones drop.
+    '''
+    sources = graph.sources()
+    inside = membership[sources] == membership[graph.neighbors]
+    n = graph.number_of_nodes()
+    links = csr_matrix((np.ones(inside.sum(), dtype=np.int8),
+                        (sources[inside], graph.neighbors[inside])), shape=(n, n))
+    return connected_components(links, directed=False)[1]
+
+
+class Partition(object):
+    '''
+    A community partition found by louvain:
+
+    membership  community of every node, 0..C-1
+    modularity  its modularity (resolution 1)
+    levels      levels of aggregation it took
+    '''
+
+    def __init__(self, membership, modularity, levels):
+        self.membership = membership
+        self.modularity = modularity
+        self.levels = levels
+
+    def __len__(self):
+        return int(self.membership.max()) + 1 if len(self.membership) else 0
+
+
+def louvain(graph, resolution=1.0, refine=True, seed=None, threads=None):
+    '''
+    Communities maximizing modularity by the Louvain method (Blondel et al.
+    2008), with the refinement of Leiden (Traag et al. 2019) unless refine is
+    False: each level is aggregated on the refined partition, whose
+    communities are merged singletons inside the communities of the local
+    moves, and the communities left disconnected by the last local moves
+    are split into their components, so every community is connected.
+
+    Works on the CSR arrays directly. The same seed gives the same
+    partition, whatever the number of threads (cpu_count() by default).
+    '''
+    n = graph.number_of_nodes()
+    total = 2.0 * graph.number_of_edges()
+    if not total:
+        return Partition(np.arange(n), 0.0, 0)
+    rng = np.random.default_rng(seed)
+    scale = resolution / total
+    threads = threads or cpu_count()
+    blocks = 4 * threads
+    own = ThreadPool(threads) if threads > 1 else None
+    mapper = own.map if own is not None else _serial_map
+
+    try:
+        adjacency = graph.adjacency()
+        strength = graph.degree().astype(np.float64)
+        membership = np.arange(n)
+        label = np.arange(n)
+        levels = 0
+        while True:
+            # links inside an aggregated node are not candidates for moves
+            links = adjacency.copy()
+            links.setdiag(0)
+            links.eliminate_zeros()
+            label = _local_moves(links, strength, label, scale, rng, mapper, blocks)
+            if refine:
+                # singletons merging inside the communities just found
+                refined = _local_moves(_within(links, label), strength,
+                                       np.arange(len(label)), scale, rng, mapper,
+                                       blocks, singletons=True)
+            else:
+                refined = label
+            refined = _compact(refined)
+            size = refined.max() + 1
+            if size == len(label):
+                break
+            levels += 1
+            membership = refined[membership]
+            indicator = _indicator(refined, size)
+            adjacency = (indicator.T @ adjacency @ indicator).tocsr()
+            strength = np.bincount(refined, weights=strength, minlength=size)
+            # the aggregated nodes start in the community of their members
+            start = np.empty(size, dtype=np.int64)
+            start[refined] = label
+            label = _compact(start)
+    finally:
+        if own is not None:
+            own.close()
+            own.join()
+
+    membership = _compact(label)[membership]
+    if refine:
+        membership = _split_disconnected(graph, membership)
+    return Partition(membership, modularity(graph, membership), levels)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+'''
+Connected components and giant component extraction.
+'''
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components as _label_components
+
+
+def connected_components(graph):
+    '''
+    Label every node with the index of its connected component, in a single
+    linear BFS over the CSR arrays.
+    '''
+    if not graph.number_of_nodes():
+        return np.empty(0, dtype=np.int32)
+    count, labels = _label_components(graph.adjacency(np.int8), directed=False)
+    return labels
+
+
+def giant_mask(graph):
+    '''boolean mask selecting the nodes of the largest connected component'''
+    labels = connected_components(graph)
+    if not len(labels):
+        return np.zeros(0, dtype=bool)
+    return labels == np.argmax(np.bincount(labels))
+
+
+def giant_component(graph):
+    '''
+    Largest connected component as a new Graph relabelled to 0..K-1;
+    labels keeps the original identifiers.
+    '''
+    return graph.subgraph(giant_mask(graph))
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+'''
+Correlation between node measures.
+
+Measures are stacked as rows of one (measures x nodes) array; Pearson and
+Spearman matrices for every pair come out of a single matrix product of
+the standardized rows. Bootstrap replicates are held as per-node draw
+counts and reduced with weighted sums, a block of replicates at a time.
+'''
+
+import numpy as np
+
+# entries of the (measures x nodes x replicates) bootstrap block kept in memory
+BLOCK_ENTRIES = 1 << 24
+
+
+def rank(values):
+    '''
+    Ranks from 1 along the last axis, tied values sharing the average of
+    their ranks (scipy.stats.rankdata's default).
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(values, axis=-1, kind='mergesort')
+    ordered = np.take_along_axis(values, order, axis=-1)
+    n = values.shape[-1]
+    positions = np.broadcast_to(np.arange(n), values.shape)
+    # first and last position of the run of ties every sorted entry is in
+    boundary = np.ones(values.shape, dtype=bool)
+    boundary[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    first = np.maximum.accumulate(np.where(boundary, positions, 0), axis=-1)
+    boundary[..., :-1] = boundary[..., 1:]
+    boundary[..., -1] = True
+    last = np.flip(np.minimum.accumulate(
+        np.flip(np.where(boundary, positions, n), axis=-1), axis=-1), axis=-1)
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=-1)
+    return ranks
+
+
+def pearson_matrix(measures):
+    '''Pearson correlation between every pair of rows; constant rows give nan'''
+    measures = np.asarray(measures, dtype=np.float64)
+    centered = measures - measures.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = centered / np.sqrt((centered * centered).sum(axis=1, keepdims=True))
+    return scaled @ scaled.T
+
+
+def spearman_matrix(measures):
+    '''Spearman rank correlation between every pair of rows'''
+    return pearson_matrix(rank(measures))
+
+
+def strongest_pair(matrix):
+    '''(i, j), i < j, of the largest off-diagonal correlation'''
+    rows, columns = np.triu_indices(len(matrix), 1)
+    best = np.nanargmax(matrix[rows, columns])
+    return int(rows[best]), int(columns[best])
+
+
+def _weighted_pearson(values, weights):
+    '''
+    Pearson matrices of (measures x nodes x replicates) values where node x
+    of replicate b counts weights[x, b] times; (replicates x measures x
+    measures).
+    '''
+    means = (values * weights).sum(axis=1) / weights.sum(axis=0)
+    scaled = (values - means[:, None, :]) * np.sqrt(weights)
+    # one small Gram matrix per replicate, as a stacked matrix product
+    scaled = np.ascontiguousarray(scaled.transpose(2, 0, 1))
+    matrix = scaled @ scaled.transpose(0, 2, 1)
+    scale = np.sqrt(np.diagonal(matrix, axis1=1, axis2=2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return matrix / scale[:, :, None] / scale[:, None, :]
+
+
+class _RankTies(object):
+    '''
+    Sort order and tie runs of one measure, so the ranks inside any
+    resample follow from cumulative weights without sorting again.
+    '''
+
+    def __init__(self, values):
+        self.order = np.argsort(values, kind='mergesort')
+        ordered = values[self.order]
+        boundary = np.ones(len(values), dtype=bool)
+        boundary[1:] = ordered[1:] != ordered[:-1]
+        self.ends = np.append(np.flatnonzero(boundary[1:]), len(values) - 1)
+        self.run = np.cumsum(boundary) - 1
+
+    def ranks(self, weights):
+        # a run of ties holding draws c + 1 .. d of the sorted resample takes
+        # their average rank (c + d + 1) / 2
+        drawn = np.cumsum(weights[self.order], axis=0)[self.ends]
+        before = np.zeros_like(drawn)
+        before[1:] = drawn[:-1]
+        ranks = np.empty(weights.shape)
+        ranks[self.order] = ((before + drawn + 1) / 2)[self.run]
+        return ranks
+
+
+def bootstrap_intervals(measures, replicates=1000, confidence=0.95, seed=None):
+    '''
+    Percentile bootstrap intervals of every pairwise Pearson and Spearman
+    coefficient. A resample draws nodes with replacement, the same draw
+    for every measure, and is represented by how many times each node was
+    drawn; a block of replicates is then reduced with weighted sums.
+    Returns ((low, high) Pearson, (low, high) Spearman).
+    '''
+    measures = np.asarray(measures, dtype=np.float64)
+    count, n = measures.shape
+    rng = np.random.default_rng(seed)
+    ties = [_RankTies(values) for values in measures]
+    size = max(1, BLOCK_ENTRIES // max(count * n, 1))
+    pearson, spearman = [], []
+    for start in range(0, replicates, size):
+        block = min(size, replicates - start)
+        # nodes along the first axis, so gathering a node fetches all of
+        # its replicates at once
+        draws = block * rng.integers(0, n, size=(block, n)) + np.arange(block)[:, None]
+        weights = np.bincount(draws.ravel(), minlength=n * block).reshape(n, block)
+        weights = weights.astype(np.float64)
+        pearson.append(_weighted_pearson(measures[:, :, None], weights))
+        ranks = np.array([tie.ranks(weights) for tie in ties])
+        spearman.append(_weighted_pearson(ranks, weights))
+    tail = 50 * (1 - confidence)
+    return tuple(np.nanpercentile(np.concatenate(samples), [tail, 100 - tail], axis=0)
+                 for samples in (pearson, spearman))
+
+
+class Correlations(object):
+    '''
+    Pairwise correlations of a set of measures:
+
+    pearson, spearman          (measures x measures) matrices
+    pair                       (i, j) with the largest Pearson coefficient
+    pearson_interval,          (low, high) bootstrap matrices, None when no
+    spearman_interval          replicates were asked for
+    '''
+
+    def __init__(self, pearson, spearman, pearson_interval=None, spearman_interval=None):
+        self.pearson = pearson
+        self.spearman = spearman
+        self.pair = strongest_pair(pearson)
+        self.pearson_interval = pearson_interval
+        self.spearman_interval = spearman_interval
+
+
+def correlations(measures, replicates=0, confidence=0.95, seed=None):
+    '''
+    Pearson and Spearman matrices of a stacked (measures x nodes) array,
+    with bootstrap confidence intervals when replicates > 0.
+    '''
+    measures = np.atleast_2d(np.asarray(measures, dtype=np.float64))
+    result = Correlations(pearson_matrix(measures), spearman_matrix(measures))
+    if replicates:
+        result.pearson_interval, result.spearman_interval = bootstrap_intervals(
+            measures, replicates, confidence, seed)
+    return result
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+'''
+Empirical distributions of node measures as arrays.
+
+Non-negative integers (degrees) are counted with np.bincount; other values
+by sorting once. Binned distributions map every value to its bin with one
+vectorized division and count the bins with np.bincount as well.
+'''
+
+import numpy as np
+
+
+class Distribution(object):
+    '''
+    Distribution of a set of values, one entry per distinct value (or bin):
+
+    value   the distinct values in increasing order; for binned
+            distributions the bin centres (geometric centres when
+            log-binned)
+    count   how many values fell on each
+    pdf     probability of each value; for binned distributions the
+            density, probability divided by the bin width
+    ccdf    fraction of the values at or above each value (bin)
+    edges   bin edges, len(value) + 1 of them; None when not binned
+    '''
+
+    def __init__(self, value, count, edges=None):
+        self.value = value
+        self.count = count
+        self.edges = edges
+        total = count.sum()
+        probability = count / total if total else count.astype(np.float64)
+        self.pdf = probability if edges is None else probability / np.diff(edges)
+        self.ccdf = np.cumsum(probability[::-1])[::-1]
+
+    def __len__(self):
+        return len(self.value)
+
+
+def _counts(values):
+    values = np.asarray(values).ravel()
+    if not len(values):
+        return values, np.zeros(0, dtype=np.int64)
+    if values.dtype.kind in 'iub':
+        low, high = values.min(), values.max()
+        # bincount stays O(N) while the range is not much larger than N
+        if low >= 0 and high <= 4 * len(values):
+            count = np.bincount(values)
+            value = np.flatnonzero(count)
+            return value.astype(values.dtype), count[value]
+    ordered = np.sort(values)
+    first = np.ones(len(ordered), dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    starts = np.flatnonzero(first)
+    return ordered[starts], np.diff(np.append(starts, len(ordered)))
+
+
+def distribution(values):
+    '''Exact distribution of values, one entry per distinct value'''
+    value, count = _counts(values)
+    return Distribution(value, count)
+
+
+def binned_distribution(values, bins=50, log=False):
+    '''
+    Distribution of values over bins equally wide bins between their
+    minimum and maximum; with log, equally wide in log scale, ignoring
+    values that are not positive. Empty bins are kept, with count 0.
+    '''
+    values = np.asarray(values, dtype=np.float64).ravel()
+    if log:
+        values = values[values > 0]
+    if not len(values):
+        return Distribution(values, np.zeros(0, dtype=np.int64), np.zeros(1))
+    scaled = np.log(values) if log else values
+    low, high = scaled.min(), scaled.max()
+    if high == low:
+        high = low + 1
+    width = (high - low) / bins
+    index = scaled - low
+    index /= width
+    index = index.astype(np.int64)
+    # the maximum itself closes the last bin
+    index[index >= bins] = bins - 1
+    count = np.bincount(index, minlength=bins)
+    edges = low + width * np.arange(bins + 1)
+    centres = (edges[:-1] + edges[1:]) / 2
+    if log:
+        edges = np.exp(edges)
+        centres = np.exp(centres)
+    return Distribution(centres, count, edges)
+
+
+def degree_distribution(graph):
+    return distribution(graph.degree())
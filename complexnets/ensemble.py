@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+'''
+Parallel ensembles of random network models.
+
+Every (model, replicate) pair is an independent task in a process pool. Its
+seed is spawned from one SeedSequence, so results do not depend on which
+worker ran it. Graphs are built and measured inside the worker and only the
+scalar measurements travel back, where they are folded into running
+statistics and dropped: memory does not grow with the number of replicates.
+'''
+
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from .statistics import RunningStats
+
+
+def map_tasks(function, tasks, processes=None, pool=None):
+    '''
+    [function(task) for task in tasks], in a process pool unless processes
+    (cpu_count() by default) is 1 or there is a single task. An existing
+    pool can be passed to avoid starting one per call.
+    '''
+    tasks = list(tasks)
+    processes = processes or cpu_count()
+    if processes == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    if pool is not None:
+        return pool.map(function, tasks)
+    own = Pool(processes)
+    try:
+        return own.map(function, tasks)
+    finally:
+        own.close()
+        own.join()
+
+
+def _run_task(task):
+    name, model, measure, seed = task
+    graph = model(seed)
+    return name, measure(graph)
+
+
+def task_seeds(seed):
+    '''endless stream of independent 32-bit integer seeds derived from seed'''
+    root = np.random.SeedSequence(seed)
+    while True:
+        yield int(root.spawn(1)[0].generate_state(1)[0])
+
+
+def _tasks(models, names, replicates, measure, seed):
+    seeds = task_seeds(seed)
+    for name in names:
+        for replicate in range(replicates):
+            yield name, models[name], measure, next(seeds)
+
+
+def run_ensemble(models, replicates, measure, seed=None, processes=None,
+                 quantiles=(0.5,)):
+    '''
+    Build and measure replicates graphs of each model.
+
+    models maps a name to a picklable function seed -> graph and measure is
+    a picklable function graph -> {measurement: scalar}. Returns
+    {name: {measurement: RunningStats}}.
+    '''
+    names = sorted(models)
+    results = {name: {} for name in names}
+    processes = processes or cpu_count()
+    chunksize = max(1, len(names) * replicates // (4 * processes))
+
+    pool = Pool(processes)
+    try:
+        # imap hands results back in task order, so the running statistics
+        # are folded identically on every run
+        tasks = _tasks(models, names, replicates, measure, seed)
+        for name, values in pool.imap(_run_task, tasks, chunksize):
+            for measurement, value in values.items():
+                if measurement not in results[name]:
+                    results[name][measurement] = RunningStats(quantiles)
+                results[name][measurement].add(value)
+    finally:
+        pool.close()
+        pool.join()
+    return results
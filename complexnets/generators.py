@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+'''
+Random network models that write edge arrays directly into a CSR Graph.
+
+All generators share the signature model(n, *parameters, seed=None), where
+seed is anything np.random.default_rng accepts (an int, a SeedSequence or a
+Generator), so functools.partial(model, n, *parameters) is a seed -> Graph
+function for complexnets.ensemble.
+'''
+
+import numpy as np
+
+from .graph import Graph
+
+
+def _pair_from_index(index):
+    '''invert index = v * (v - 1) / 2 + u over the pairs u < v'''
+    v = np.floor((1 + np.sqrt(1 + 8 * index.astype(np.float64))) / 2).astype(np.int64)
+    # float rounding can be off by one either way for very large indices
+    v -= (v * (v - 1) // 2) > index
+    v += ((v + 1) * v // 2) <= index
+    return index - v * (v - 1) // 2, v
+
+
+def erdos_renyi(n, p, seed=None):
+    '''
+    G(n, p) in O(n + m): instead of flipping a coin for each of the
+    n(n - 1)/2 pairs, jump straight to the next edge with geometric gaps
+    (Batagelj & Brandes, 2005).
+    '''
+    rng = np.random.default_rng(seed)
+    pairs = n * (n - 1) // 2
+    if p <= 0 or pairs == 0:
+        index = np.empty(0, dtype=np.int64)
+    elif p >= 1:
+        index = np.arange(pairs, dtype=np.int64)
+    else:
+        blocks = []
+        last = -1
+        batch = int(pairs * p + 4 * np.sqrt(pairs * p) + 16)
+        while last < pairs:
+            gaps = rng.geometric(p, size=batch)
+            positions = last + np.cumsum(gaps)
+            blocks.append(positions[positions < pairs])
+            last = positions[-1]
+        index = np.concatenate(blocks)
+    sources, targets = _pair_from_index(index)
+    return Graph.from_edges(sources, targets, n)
+
+
+def watts_strogatz(n, k, p, seed=None):
+    '''
+    Ring lattice with k // 2 neighbors on each side, whose edges get their
+    far endpoint rewired with probability p. Rewired endpoints that would
+    create a self-loop or a repeated edge are redrawn in bulk until none do.
+    '''
+    rng = np.random.default_rng(seed)
+    half = k // 2
+    sources = np.repeat(np.arange(n, dtype=np.int64), half)
+    targets = (sources + np.tile(np.arange(1, half + 1), n)) % n
+
+    rewire = np.flatnonzero(rng.random(len(sources)) < p)
+    pending = rewire
+    while len(pending):
+        targets[pending] = rng.integers(0, n, size=len(pending))
+        keys = np.minimum(sources, targets) * n + np.maximum(sources, targets)
+        # a rewired edge is kept unless it is a loop or it repeats a lattice
+        # edge or an earlier rewired edge
+        rewired = np.zeros(len(keys), dtype=bool)
+        rewired[rewire] = True
+        order = np.lexsort((rewired, keys))
+        repeated = np.zeros(len(keys), dtype=bool)
+        repeated[order[1:]] = keys[order[1:]] == keys[order[:-1]]
+        bad = (sources[rewire] == targets[rewire]) | repeated[rewire]
+        pending = rewire[bad]
+    return Graph.from_edges(sources, targets, n)
+
+
+def _linear_attachment(n, m, rng):
+    '''
+    Linear preferential attachment on the list of edge endpoints, where a
+    uniform endpoint is a degree-proportional node. Every target slot points
+    at an earlier slot, so the whole list is resolved with vectorized
+    pointer jumping instead of node by node.
+    '''
+    edges = (n - m) * m
+    slots = np.arange(2 * edges, dtype=np.int64)
+    # slot 2e holds the new node of edge e, slot 2e + 1 its target
+    owner = m + slots // (2 * m)
+    values = np.where(slots % 2 == 0, owner, -1)
+    values[1:2 * m:2] = np.arange(m)
+    pointers = slots.copy()
+    known = values >= 0
+    unknown = np.flatnonzero(~known)
+
+    pending = unknown
+    while len(pending):
+        # a uniform slot among those filled before the new node's block
+        available = 2 * m * (owner[pending] - m)
+        pointers[pending] = (rng.random(len(pending)) * available).astype(np.int64)
+
+        # pointer jumping, only over the chains that have not yet reached a
+        # slot with a known node
+        resolved = pointers.copy()
+        active = unknown[~known[resolved[unknown]]]
+        while len(active):
+            resolved[active] = resolved[resolved[active]]
+            active = active[~known[resolved[active]]]
+        chosen = values[resolved]
+
+        # redraw repeated targets of the same new node
+        block = chosen[1::2].reshape(-1, m)
+        order = np.argsort(block, axis=1, kind='mergesort')
+        ranked = np.take_along_axis(block, order, axis=1)
+        repeated = np.zeros(block.shape, dtype=bool)
+        np.put_along_axis(repeated, order[:, 1:], ranked[:, 1:] == ranked[:, :-1], axis=1)
+        pending = 2 * np.flatnonzero(repeated.reshape(-1)) + 1
+
+    return chosen[0::2], chosen[1::2]
+
+
+class _Fenwick(object):
+    '''binary indexed tree of non-negative weights with prefix search'''
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0.0] * (size + 1)
+        self.top = 1 << max(size.bit_length() - 1, 0)
+
+    def add(self, index, delta):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def find(self, value):
+        '''smallest index whose prefix sum exceeds value'''
+        position = 0
+        step = self.top
+        while step:
+            upper = position + step
+            if upper <= self.size and self.tree[upper] <= value:
+                position = upper
+                value -= self.tree[upper]
+            step >>= 1
+        return min(position, self.size - 1)
+
+
+def _power_attachment(n, m, power, rng):
+    '''
+    Attachment probability proportional to degree ** power, sampled from a
+    Fenwick tree of the weights in O(log n) per target.
+    '''
+    degree = [0] * n
+    tree = _Fenwick(n)
+    total = 0.0
+    sources = []
+    targets = []
+
+    def set_degree(node, value, total):
+        old = degree[node] ** power if degree[node] else 0.0
+        degree[node] = value
+        new = value ** power
+        tree.add(node, new - old)
+        return total + new - old
+
+    for target in range(m):
+        total = set_degree(target, 1, total)
+    total = set_degree(m, m, total)
+    sources.extend([m] * m)
+    targets.extend(range(m))
+
+    for node in range(m + 1, n):
+        chosen = []
+        # sample without replacement by zeroing each pick until the end
+        for u in rng.random(m).tolist():
+            target = tree.find(u * total)
+            weight = degree[target] ** power
+            tree.add(target, -weight)
+            total -= weight
+            chosen.append(target)
+        for target in chosen:
+            tree.add(target, degree[target] ** power)
+            total += degree[target] ** power
+            total = set_degree(target, degree[target] + 1, total)
+        total = set_degree(node, m, total)
+        sources.extend([node] * m)
+        targets.extend(chosen)
+    return np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64)
+
+
+def barabasi_albert(n, m, power=1, seed=None):
+    '''
+    Preferential attachment: every new node links to m distinct existing
+    nodes chosen with probability proportional to degree ** power. The
+    first new node (node m) links to nodes 0..m-1.
+    '''
+    rng = np.random.default_rng(seed)
+    if n <= m:
+        return Graph.from_edges([], [], n)
+    if power == 1:
+        sources, targets = _linear_attachment(n, m, rng)
+    else:
+        sources, targets = _power_attachment(n, m, power, rng)
+    return Graph.from_edges(sources, targets, n)
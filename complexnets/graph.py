@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+'''
+Compact undirected graph backed by int32 CSR arrays.
+'''
+
+import numpy as np
+
+INDEX_DTYPE = np.int32
+
+
+def _offsets_dtype(size):
+    # 2M entries only need int64 offsets past the int32 range
+    if size > np.iinfo(np.int32).max:
+        return np.int64
+    return INDEX_DTYPE
+
+
+class Graph(object):
+    '''
+    Simple undirected graph (no self-loops, no multi-edges) in CSR form.
+
+    Nodes are the integers 0..N-1; labels[i] keeps the identifier node i had
+    in the source file. Neighbor lists are sorted. weights, when present,
+    holds one edge weight per entry of neighbors (both directions of an
+    edge carry the same weight).
+    '''
+
+    def __init__(self, offsets, neighbors, labels=None, weights=None):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        if labels is None:
+            labels = np.arange(len(offsets) - 1)
+        self.labels = labels
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, sources, targets, num_nodes=None, labels=None, weights=None):
+        '''
+        Build a graph from two endpoint arrays of node indices in 0..N-1.
+        Self-loops are dropped and repeated edges are merged; with weights,
+        one per edge, the weights of repeated edges (in either direction)
+        are summed.
+        '''
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if num_nodes is None:
+            if labels is not None:
+                num_nodes = len(labels)
+            elif len(sources):
+                num_nodes = int(max(sources.max(), targets.max())) + 1
+            else:
+                num_nodes = 0
+
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+        loops = sources == targets
+        if loops.any():
+            sources = sources[~loops]
+            targets = targets[~loops]
+            if weights is not None:
+                weights = weights[~loops]
+
+        # store both directions, then sort and dedupe on a single int64 key
+        keys = np.concatenate((sources * num_nodes + targets,
+                               targets * num_nodes + sources))
+        if weights is None:
+            keys.sort()
+        else:
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            weights = np.concatenate((weights, weights))[order]
+        if len(keys):
+            first = np.concatenate(([True], keys[1:] != keys[:-1]))
+            keys = keys[first]
+            if weights is not None:
+                weights = np.add.reduceat(weights, np.flatnonzero(first))
+        rows = keys // num_nodes if num_nodes else keys
+
+        offsets = np.zeros(num_nodes + 1, dtype=_offsets_dtype(len(keys)))
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=offsets[1:])
+        neighbors = (keys - rows * num_nodes).astype(INDEX_DTYPE)
+        return cls(offsets, neighbors, labels, weights)
+
+    @classmethod
+    def from_labels(cls, sources, targets, weights=None):
+        '''
+        Build a graph from two arrays of arbitrary node identifiers, mapping
+        them to 0..N-1 in sorted identifier order.
+        '''
+        identifiers = np.concatenate((sources, targets))
+        order = np.argsort(identifiers)
+        ordered = identifiers[order]
+        first = np.ones(len(ordered), dtype=bool)
+        first[1:] = ordered[1:] != ordered[:-1]
+        labels = ordered[first]
+        inverse = np.empty(len(ordered), dtype=np.int64)
+        inverse[order] = np.cumsum(first) - 1
+        count = len(sources)
+        return cls.from_edges(inverse[:count], inverse[count:], len(labels), labels, weights)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        nodes = list(graph.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = np.array([(index[u], index[v]) for u, v in graph.edges()],
+                         dtype=np.int64).reshape(-1, 2)
+        labels = np.empty(len(nodes), dtype=object)
+        labels[:] = nodes
+        return cls.from_edges(edges[:, 0], edges[:, 1], len(nodes), labels)
+
+    def to_networkx(self):
+        import networkx as nx
+        graph = nx.Graph()
+        graph.add_nodes_from(range(self.number_of_nodes()))
+        sources, targets = self.edges()
+        graph.add_edges_from(zip(sources.tolist(), targets.tolist()))
+        return graph
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def number_of_nodes(self):
+        return len(self.offsets) - 1
+
+    def number_of_edges(self):
+        return len(self.neighbors) // 2
+
+    def degree(self):
+        return np.diff(self.offsets)
+
+    def neighbors_of(self, node):
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+    def sources(self):
+        '''source endpoint of every CSR entry, aligned with neighbors'''
+        return np.repeat(np.arange(self.number_of_nodes(), dtype=INDEX_DTYPE),
+                         self.degree())
+
+    def edges(self):
+        '''each undirected edge once, as (u, v) arrays with u < v'''
+        sources = self.sources()
+        upper = sources < self.neighbors
+        return sources[upper], self.neighbors[upper]
+
+    def adjacency(self, dtype=np.float64):
+        '''scipy.sparse adjacency matrix sharing the CSR index arrays'''
+        from scipy.sparse import csr_matrix
+        n = self.number_of_nodes()
+        data = np.ones(len(self.neighbors), dtype=dtype)
+        return csr_matrix((data, self.neighbors, self.offsets), shape=(n, n))
+
+    def subgraph(self, mask):
+        '''
+        Induced subgraph on the nodes where mask is True, relabelled to
+        0..K-1 in the original order.
+        '''
+        mask = np.asarray(mask, dtype=bool)
+        index = np.cumsum(mask) - 1
+        sources = self.sources()
+        keep = mask[sources] & mask[self.neighbors]
+
+        degree = np.bincount(index[sources[keep]], minlength=int(mask.sum()))
+        offsets = np.zeros(len(degree) + 1, dtype=_offsets_dtype(int(keep.sum())))
+        np.cumsum(degree, out=offsets[1:])
+        neighbors = index[self.neighbors[keep]].astype(INDEX_DTYPE)
+        weights = None if self.weights is None else self.weights[keep]
+        return Graph(offsets, neighbors, self.labels[mask], weights)
+
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+'''
+Bulk edge-list loader.
+
+The file is memory-mapped and parsed in large newline-aligned chunks, each
+one with a handful of NumPy passes over its bytes: any run of spaces, tabs
+or '\r' separates tokens, so single-space, double-space and CRLF files all
+parse the same way. Any other byte (signs, decimal points, comment lines)
+is an error rather than a separator.
+'''
+
+import os
+
+import numpy as np
+
+from .graph import Graph
+
+CHUNK_SIZE = 1 << 24
+NEWLINE = ord('\n')
+ZERO = ord('0')
+NINE = ord('9')
+# longest token that always fits in int64
+MAX_DIGITS = 18
+POWERS = 10 ** np.arange(MAX_DIGITS + 1, dtype=np.int64)
+
+# bytes allowed in an edge list: digits and whitespace
+ALLOWED = np.zeros(256, dtype=bool)
+ALLOWED[ZERO:NINE + 1] = True
+ALLOWED[[ord(' '), ord('\t'), ord('\r'), NEWLINE]] = True
+
+
+def _parse_chunk(data):
+    '''parse a block of whole lines into a (rows, columns) int64 array'''
+    invalid = np.flatnonzero(~ALLOWED[data])
+    if len(invalid):
+        raise ValueError("unexpected character %r in edge list" % chr(data[invalid[0]]))
+    digit = (data >= ZERO) & (data <= NINE)
+    bounds = np.diff(np.concatenate(([0], digit.view(np.int8), [0])))
+    starts = np.flatnonzero(bounds == 1)
+    ends = np.flatnonzero(bounds == -1)
+    if not len(starts):
+        return np.empty((0, 0), dtype=np.int64)
+    lengths = ends - starts
+    if lengths.max() > MAX_DIGITS:
+        raise ValueError("integer with more than %d digits in edge list" % MAX_DIGITS)
+
+    # every digit times its place value, summed per token
+    positions = np.flatnonzero(digit)
+    places = np.repeat(ends, lengths) - positions - 1
+    digits = (data[positions] - ZERO).astype(np.int64) * POWERS[places]
+    first = np.zeros(len(starts), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=first[1:])
+    values = np.add.reduceat(digits, first)
+
+    # tokens per line, ignoring blank lines
+    lines = np.searchsorted(np.flatnonzero(data == NEWLINE), starts)
+    per_line = np.bincount(lines)
+    per_line = per_line[per_line > 0]
+    columns = per_line[0]
+    if (per_line != columns).any():
+        raise ValueError("inconsistent number of columns in edge list")
+    return values.reshape(-1, columns)
+
+
+def iter_columns(filename, chunk_size=CHUNK_SIZE):
+    '''
+    Parse a whitespace-separated file of non-negative integers one chunk of
+    whole lines at a time, yielding (rows, columns) int64 arrays; memory
+    stays at one chunk whatever the size of the file.
+    '''
+    if os.path.getsize(filename) == 0:
+        return
+    data = np.memmap(filename, dtype=np.uint8, mode='r')
+
+    columns = None
+    start = 0
+    while start < len(data):
+        stop = min(start + chunk_size, len(data))
+        # extend the chunk up to the end of its last line
+        if stop < len(data):
+            newlines = np.flatnonzero(data[stop:stop + chunk_size] == NEWLINE)
+            while not len(newlines) and stop < len(data):
+                stop = min(stop + chunk_size, len(data))
+                newlines = np.flatnonzero(data[stop:stop + chunk_size] == NEWLINE)
+            stop = stop + newlines[0] + 1 if len(newlines) else len(data)
+        block = _parse_chunk(np.asarray(data[start:stop]))
+        if block.size:
+            if columns is not None and block.shape[1] != columns:
+                raise ValueError("inconsistent number of columns in edge list")
+            columns = block.shape[1]
+            yield block
+        start = stop
+
+
+def read_columns(filename, chunk_size=CHUNK_SIZE):
+    '''
+    Read a whitespace-separated file of non-negative integers into a
+    (rows, columns) int64 array.
+    '''
+    blocks = list(iter_columns(filename, chunk_size))
+    if not blocks:
+        return np.empty((0, 0), dtype=np.int64)
+    return np.concatenate(blocks)
+
+
+def read_edgelist(filename, weighted=False):
+    '''
+    Read source and target columns (and the third column as weights when
+    weighted is set) from an edge-list file.
+    '''
+    columns = read_columns(filename)
+    if not columns.size:
+        columns = np.empty((0, 3), dtype=np.int64)
+    if weighted:
+        if columns.shape[1] < 3:
+            raise ValueError("%s has no weight column" % filename)
+        return columns[:, 0], columns[:, 1], columns[:, 2]
+    return columns[:, 0], columns[:, 1]
+
+
+def read_graph(filename, weighted=False):
+    '''
+    Load an edge-list file straight into a CSR Graph; with weighted, the
+    third column becomes graph.weights (summed over repeated edges).
+    '''
+    if weighted:
+        sources, targets, weights = read_edgelist(filename, weighted=True)
+        return Graph.from_labels(sources, targets, weights)
+    sources, targets = read_edgelist(filename)
+    return Graph.from_labels(sources, targets)
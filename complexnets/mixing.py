@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+'''
+Degree correlations (mixing) over the CSR graph.
+
+The sum of the neighbours' degrees of every node is one sparse product
+A k; knn(k) then folds those sums by degree class with np.bincount. Every
+array is indexed by node, so degrees and knn line up by construction.
+
+Assortativity is the Pearson correlation of a node value over the two
+endpoints of every edge. The endpoint means and variances only depend on
+how many edges each node is an endpoint of, so they come from node arrays,
+and the covariance is a single pass over the edge arrays (or over the
+chunks of an edge-list file).
+'''
+
+import numpy as np
+
+from .loader import CHUNK_SIZE, iter_columns
+
+
+def neighbor_degree_sums(graph):
+    '''sum of the degrees of each node's neighbours, A k'''
+    return graph.adjacency() @ graph.degree().astype(np.float64)
+
+
+def average_neighbor_degree(graph):
+    '''
+    knn(x), the mean degree of the neighbours of every node (0 for isolated
+    nodes), as networkx's average_neighbor_degree.
+    '''
+    degree = graph.degree()
+    knn = np.zeros(len(degree))
+    np.divide(neighbor_degree_sums(graph), degree, out=knn, where=degree > 0)
+    return knn
+
+
+def degree_connectivity(graph):
+    '''
+    knn(k), the mean neighbour degree over the nodes of degree k, for every
+    degree k > 0 present; returns (k, knn) arrays, as networkx's
+    average_degree_connectivity.
+    '''
+    degree = graph.degree()
+    if not len(degree):
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    sums = np.bincount(degree, weights=neighbor_degree_sums(graph))
+    edges = np.bincount(degree) * np.arange(degree.max() + 1)
+    k = np.flatnonzero(edges)
+    return k, sums[k] / edges[k]
+
+
+def _endpoint_moments(values, count):
+    '''mean and variance of values over the count[v] edge endpoints at v'''
+    total = count.sum()
+    mean = (count * values).sum() / total
+    return mean, (count * (values - mean) ** 2).sum() / total
+
+
+def _correlation(x, x_count, y, y_count, pairs):
+    '''
+    Pearson correlation of x at the tail and y at the head over the edges
+    yielded as (tails, heads) chunks; x_count and y_count count the edges
+    each node is the tail (head) of.
+    '''
+    mean_x, var_x = _endpoint_moments(x, x_count)
+    mean_y, var_y = _endpoint_moments(y, y_count)
+    covariance = sum(((x[tails] - mean_x) * (y[heads] - mean_y)).sum()
+                     for tails, heads in pairs)
+    covariance /= x_count.sum()
+    if not var_x or not var_y:
+        return np.nan
+    return covariance / np.sqrt(var_x * var_y)
+
+
+def numeric_assortativity(graph, values):
+    '''
+    Assortativity of a numeric node attribute, indexed by node: its Pearson
+    correlation over the endpoints of every edge, both orientations
+    counted (networkx's numeric_assortativity_coefficient).
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    degree = graph.degree()
+    return _correlation(values, degree, values, degree,
+                        [(graph.sources(), graph.neighbors)])
+
+
+def degree_assortativity(graph, weighted=False):
+    '''
+    Degree assortativity of an undirected graph. With weighted, node
+    strengths (sums of graph.weights, e.g. from read_graph(weighted=True))
+    replace degrees, as in networkx's degree_assortativity_coefficient(weight=).
+    '''
+    if not weighted:
+        values = graph.degree()
+    elif graph.weights is None:
+        raise ValueError('graph has no edge weights')
+    else:
+        values = np.bincount(graph.sources(), weights=graph.weights,
+                             minlength=graph.number_of_nodes())
+    return numeric_assortativity(graph, values)
+
+
+def attribute_assortativity(graph, categories):
+    '''
+    Assortativity of a categorical node attribute, integer codes indexed by
+    node, from the mixing matrix e of category pairs over edge endpoints:
+    (tr e - sum a b) / (1 - sum a b) (networkx's
+    attribute_assortativity_coefficient).
+    '''
+    categories = np.asarray(categories, dtype=np.int64)
+    size = categories.max() + 1 if len(categories) else 1
+    pairs = categories[graph.sources()] * size + categories[graph.neighbors]
+    mixing = np.bincount(pairs, minlength=size * size).reshape(size, size)
+    mixing = mixing / max(mixing.sum(), 1)
+    expected = (mixing.sum(axis=1) * mixing.sum(axis=0)).sum()
+    if expected == 1:
+        return np.nan
+    return (np.trace(mixing) - expected) / (1 - expected)
+
+
+def directed_assortativity(sources, targets, num_nodes=None, x='out', y='in'):
+    '''
+    Degree assortativity of a directed edge list: the correlation between
+    the x-degree ('in' or 'out') of every edge's source and the y-degree of
+    its target (networkx's degree_assortativity_coefficient on a DiGraph).
+    '''
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if num_nodes is None:
+        num_nodes = int(max(sources.max(), targets.max())) + 1 if len(sources) else 0
+    degree = {'out': np.bincount(sources, minlength=num_nodes),
+              'in': np.bincount(targets, minlength=num_nodes)}
+    return _correlation(degree[x].astype(np.float64), degree['out'],
+                        degree[y].astype(np.float64), degree['in'],
+                        [(sources, targets)])
+
+
+def _distinct_edges(block):
+    '''edges of an edge-list chunk as (low, high) rows, without self-loops or repeats'''
+    block = np.sort(block[:, :2], axis=1)
+    block = block[block[:, 0] != block[:, 1]]
+    return np.unique(block, axis=0)
+
+
+def stream_assortativity(filename, chunk_size=CHUNK_SIZE):
+    '''
+    Degree assortativity of an undirected edge-list file too large for
+    memory, in two streaming passes over its chunks: one for the degrees,
+    one for the covariance. Self-loops are skipped and repeats of an edge
+    (in either direction) are merged within each chunk, so the result
+    equals degree_assortativity whenever the file fits in one chunk or
+    lists each edge once; repeats split across chunks still count twice.
+    Node labels index the degree array directly, so memory is one chunk
+    plus O(largest label).
+    '''
+    degree = np.zeros(0, dtype=np.int64)
+    for block in iter_columns(filename, chunk_size):
+        counts = np.bincount(_distinct_edges(block).ravel())
+        if len(counts) > len(degree):
+            degree = np.concatenate((degree, np.zeros(len(counts) - len(degree), dtype=np.int64)))
+        degree[:len(counts)] += counts
+
+    def pairs():
+        for block in iter_columns(filename, chunk_size):
+            block = _distinct_edges(block)
+            yield block[:, 0], block[:, 1]
+            yield block[:, 1], block[:, 0]
+
+    values = degree.astype(np.float64)
+    return _correlation(values, degree, values, degree, pairs())
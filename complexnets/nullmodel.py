@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+'''
+Degree-preserving null models.
+
+Double-edge swaps replace edges (a, b), (c, d) by (a, d), (c, b), keeping
+every degree. They are proposed in batches on the edge arrays: a batch
+uses every edge at most once, and a proposal is rejected when it would
+create a self-loop, an edge already present (membership in the sorted
+array of edge keys, updated after each batch) or an edge proposed twice
+in the batch. Replicas are built and measured in the
+ensemble process pool, so z-scores of any scalar measure against the null
+model only carry scalars between processes.
+'''
+
+from functools import partial
+import warnings
+
+import numpy as np
+
+from .clustering import average_clustering, transitivity
+from .ensemble import run_ensemble
+from .graph import Graph
+from .mixing import degree_assortativity
+
+# scalar measures compared against the null model by default
+MEASURES = {
+    'assortativity': degree_assortativity,
+    'average_clustering': average_clustering,
+    'transitivity': transitivity,
+}
+
+
+def _keys(u, v, n):
+    return np.minimum(u, v) * n + np.maximum(u, v)
+
+
+def rewire(graph, swaps_per_edge=10, seed=None, batch=None, max_tries=None):
+    '''
+    Degree-preserving randomization of graph by swaps_per_edge x M accepted
+    double-edge swaps, in batches of batch proposals (M / 4 by default,
+    which maximizes the swaps accepted per batch when every edge may take
+    part in one proposal only). Returns a new Graph with the same degree
+    of every node.
+
+    At most max_tries swaps are proposed (100 per swap asked for by
+    default); graphs with few or no valid swaps, such as stars, complete
+    or very dense graphs, stop there with a RuntimeWarning and the swaps
+    accepted so far.
+    '''
+    n = graph.number_of_nodes()
+    u, v = (np.asarray(column, dtype=np.int64) for column in graph.edges())
+    m = len(u)
+    if m < 2:
+        return Graph.from_edges(u, v, n)
+    rng = np.random.default_rng(seed)
+    batch = batch or max(1, m // 4)
+    keys = np.sort(_keys(u, v, n))
+    target = swaps_per_edge * m
+    max_tries = 100 * target if max_tries is None else max_tries
+    done = 0
+    tries = 0
+    while done < target:
+        if tries >= max_tries:
+            warnings.warn('rewire stopped after %d proposals with %d of %d swaps'
+                          % (tries, done, target), RuntimeWarning)
+            break
+        size = min(batch, target - done, max_tries - tries)
+        tries += size
+        first = rng.integers(0, m, size=size)
+        second = rng.integers(0, m, size=size)
+        # each edge takes part in at most one proposal of the batch
+        uses = np.bincount(np.concatenate((first, second)), minlength=m)
+        valid = (uses[first] == 1) & (uses[second] == 1)
+        first, second = first[valid], second[valid]
+
+        # (a, b), (c, d) -> (a, d), (c, b), with (c, d) in a random direction
+        a, b = u[first], v[first]
+        flip = rng.random(len(second)) < 0.5
+        c = np.where(flip, v[second], u[second])
+        d = np.where(flip, u[second], v[second])
+        new_first = _keys(a, d, n)
+        new_second = _keys(c, b, n)
+
+        # existing and twice-proposed edges, looked up in sorted order so
+        # searchsorted walks the keys forward
+        proposed = np.concatenate((new_first, new_second))
+        order = np.argsort(proposed)
+        ordered = proposed[order]
+        found = np.minimum(np.searchsorted(keys, ordered), len(keys) - 1)
+        clash = keys[found] == ordered
+        same = ordered[1:] == ordered[:-1]
+        clash[1:] |= same
+        clash[:-1] |= same
+        rejected = np.empty(len(proposed), dtype=bool)
+        rejected[order] = clash
+        ok = (a != d) & (c != b) & ~rejected[:len(first)] & ~rejected[len(first):]
+
+        first, second = first[ok], second[ok]
+        removed = np.sort(np.concatenate((_keys(a[ok], b[ok], n), _keys(c[ok], d[ok], n))))
+        added = np.sort(np.concatenate((new_first[ok], new_second[ok])))
+        u[first], v[first] = a[ok], d[ok]
+        u[second], v[second] = c[ok], b[ok]
+        # update the sorted keys in place of sorting them again
+        keys = np.delete(keys, np.searchsorted(keys, removed))
+        keys = np.insert(keys, np.searchsorted(keys, added), added)
+        done += len(first)
+    return Graph.from_edges(u, v, n)
+
+
+def _replica(graph, swaps_per_edge, seed):
+    return rewire(graph, swaps_per_edge, seed)
+
+
+def _measure(measures, graph):
+    return {name: measure(graph) for name, measure in measures.items()}
+
+
+class NullComparison(object):
+    '''
+    A measure on the graph against its values on degree-preserving replicas:
+
+    observed    value on the graph
+    mean, std   over the replicas (std with ddof=1)
+    z           (observed - mean) / std
+    '''
+
+    def __init__(self, observed, stats):
+        self.observed = observed
+        self.mean = stats.mean
+        self.std = stats.std(ddof=1)
+        self.z = (observed - self.mean) / self.std if self.std else float('nan')
+
+
+def null_model_zscores(graph, measures=None, replicates=100, swaps_per_edge=10,
+                       seed=None, processes=None):
+    '''
+    Compare scalar measures of graph, a dict name -> picklable function
+    graph -> scalar (MEASURES by default), with their distribution over
+    replicates degree-preserving rewirings built in a process pool.
+    Returns {name: NullComparison}.
+    '''
+    measures = MEASURES if measures is None else measures
+    models = {'null': partial(_replica, graph, swaps_per_edge)}
+    stats = run_ensemble(models, replicates, partial(_measure, measures),
+                         seed=seed, processes=processes)['null']
+    return {name: NullComparison(measure(graph), stats[name])
+            for name, measure in measures.items()}
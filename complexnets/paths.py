@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+'''
+Shortest path lengths over the CSR graph.
+
+Distances from a block of sources are computed with scipy's compiled
+unit-weight traversal and reduced to a few numbers per source (plus one
+distance histogram) before the next block starts, so memory stays at one
+block of rows. Blocks can be
+spread over a process pool.
+'''
+
+from multiprocessing import cpu_count
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+from scipy.stats import norm
+
+from .ensemble import map_tasks
+
+# distance entries held in memory per block of sources
+BLOCK_ENTRIES = 1 << 24
+
+
+def _block_summary(task):
+    offsets, neighbors, sources = task
+    n = len(offsets) - 1
+    adjacency = csr_matrix((np.ones(len(neighbors), dtype=np.int8), neighbors, offsets),
+                           shape=(n, n))
+    distances = shortest_path(adjacency, method='D', unweighted=True, indices=sources)
+    reachable = np.isfinite(distances)
+    distances[~reachable] = 0
+    totals = distances.sum(axis=1)
+    # the source itself is reachable at distance 0
+    counts = reachable.sum(axis=1) - 1
+    eccentricity = distances.max(axis=1).astype(np.int64)
+    histogram = np.bincount(distances[reachable].astype(np.int64))
+    return totals, counts, eccentricity, histogram
+
+
+def _blocks(graph, sources, processes):
+    n = graph.number_of_nodes()
+    size = max(1, BLOCK_ENTRIES // max(n, 1))
+    if processes > 1:
+        size = min(size, -(-len(sources) // (4 * processes)))
+    for start in range(0, len(sources), size):
+        yield graph.offsets, graph.neighbors, sources[start:start + size]
+
+
+class DistanceProfile(object):
+    '''
+    Everything a set of BFS runs tells about distances, kept in O(N):
+
+    histogram[d]     ordered (source, target) pairs at distance d, d = 0
+                     counting each source with itself
+    totals[i]        sum of the distances from sources[i] to what it reaches
+    counts[i]        number of nodes sources[i] reaches, itself excluded
+    eccentricity[i]  largest distance from sources[i] within its component
+    '''
+
+    def __init__(self, num_nodes, sources, totals, counts, eccentricity, histogram):
+        self.num_nodes = num_nodes
+        self.sources = sources
+        self.totals = totals
+        self.counts = counts
+        self.eccentricity = eccentricity
+        self.histogram = histogram
+
+    def average_shortest_path_length(self):
+        '''
+        Mean distance over all ordered pairs of distinct nodes that are
+        connected (the usual definition when the graph is connected).
+        '''
+        pairs = self.counts.sum()
+        return self.totals.sum() / pairs if pairs else 0.0
+
+    def diameter(self):
+        return int(self.eccentricity.max()) if len(self.eccentricity) else 0
+
+    def closeness(self):
+        '''
+        Closeness of each source, scaled by the fraction of the graph it
+        reaches as networkx does for disconnected graphs.
+        '''
+        closeness = np.zeros(len(self.totals))
+        reached = self.totals > 0
+        closeness[reached] = self.counts[reached] / self.totals[reached]
+        if self.num_nodes > 1:
+            closeness *= self.counts / (self.num_nodes - 1)
+        return closeness
+
+
+def distance_profile(graph, sources=None, processes=None, pool=None):
+    '''
+    Run one BFS from every source (all nodes by default) and stream the
+    distances into a DistanceProfile; the distance matrix is never held
+    beyond one block of rows. Blocks run through ensemble.map_tasks.
+    '''
+    n = graph.number_of_nodes()
+    if sources is None:
+        sources = np.arange(n)
+    sources = np.asarray(sources, dtype=np.int64)
+    if not len(sources):
+        return DistanceProfile(n, sources, np.zeros(0), np.zeros(0, dtype=np.int64),
+                               np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    processes = processes or cpu_count()
+
+    summaries = map_tasks(_block_summary, _blocks(graph, sources, processes), processes, pool)
+
+    totals, counts, eccentricity, histograms = zip(*summaries)
+    histogram = np.zeros(max(len(h) for h in histograms), dtype=np.int64)
+    for block in histograms:
+        histogram[:len(block)] += block
+    return DistanceProfile(n, sources, np.concatenate(totals), np.concatenate(counts),
+                           np.concatenate(eccentricity), histogram)
+
+
+def average_shortest_path_length(graph, processes=None, pool=None):
+    return distance_profile(graph, None, processes, pool).average_shortest_path_length()
+
+
+def sampled_average_shortest_path_length(graph, samples, confidence=0.95,
+                                         seed=None, processes=None, pool=None):
+    '''
+    Estimate the average shortest path length from BFS runs out of samples
+    sources drawn without replacement.
+
+    Returns (estimate, low, high), a normal-approximation confidence interval
+    around the mean of the per-source averages with the finite population
+    correction; exact when samples covers every node of a connected graph.
+    '''
+    n = graph.number_of_nodes()
+    samples = min(samples, n)
+    sources = np.random.default_rng(seed).choice(n, size=samples, replace=False)
+    profile = distance_profile(graph, sources, processes, pool)
+    reached = profile.counts > 0
+    averages = profile.totals[reached] / profile.counts[reached]
+    if not len(averages):
+        return 0.0, 0.0, 0.0
+
+    estimate = averages.mean()
+    if len(averages) < 2:
+        return estimate, -np.inf, np.inf
+    error = averages.std(ddof=1) / np.sqrt(len(averages))
+    error *= np.sqrt((n - samples) / max(n - 1, 1))
+    margin = norm.ppf(0.5 + confidence / 2) * error
+    return estimate, estimate - margin, estimate + margin
+
+
+class Extremes(object):
+    '''
+    Extreme eccentricities of a connected graph:
+
+    diameter, radius     largest and smallest eccentricity
+    periphery, center    nodes whose eccentricity is the diameter, radius
+    runs                 BFS runs it took
+    '''
+
+    def __init__(self, diameter, radius, periphery, center, runs):
+        self.diameter = diameter
+        self.radius = radius
+        self.periphery = periphery
+        self.center = center
+        self.runs = runs
+
+
+def _bounding_eccentricities(graph, diameter_only):
+    '''
+    Takes & Kosters' BoundingDiameters: a BFS from v with eccentricity e
+    bounds every other node w by max(d(v, w), e - d(v, w)) <= ecc(w) <=
+    e + d(v, w). Sources alternate between the candidate with the largest
+    upper bound and the one with the smallest lower bound (ties to the
+    higher degree), and a node stops being a candidate once its
+    eccentricity is known or its bounds rule it out of the diameter (and
+    radius) it could still affect.
+
+    Returns (lower, upper, known, runs).
+    '''
+    n = graph.number_of_nodes()
+    adjacency = csr_matrix((np.ones(len(graph.neighbors), dtype=np.int8),
+                            graph.neighbors, graph.offsets), shape=(n, n))
+    degree = graph.degree()
+    lower = np.zeros(n, dtype=np.int64)
+    upper = np.full(n, n, dtype=np.int64)
+    candidate = np.ones(n, dtype=bool)
+    runs = 0
+    while candidate.any():
+        nodes = np.flatnonzero(candidate)
+        if runs % 2 == 0:
+            source = nodes[np.lexsort((-degree[nodes], -upper[nodes]))[0]]
+        else:
+            source = nodes[np.lexsort((-degree[nodes], lower[nodes]))[0]]
+        distance = shortest_path(adjacency, method='D', unweighted=True, indices=source)
+        if not runs and not np.isfinite(distance).all():
+            raise ValueError('graph is not connected')
+        runs += 1
+        distance = distance.astype(np.int64)
+        eccentricity = distance.max()
+        np.maximum(lower, np.maximum(distance, eccentricity - distance), out=lower)
+        np.minimum(upper, eccentricity + distance, out=upper)
+
+        known = lower == upper
+        # nodes tied with the bound are kept, they may belong to the
+        # periphery (center)
+        if diameter_only:
+            candidate &= ~known & (upper > lower.max())
+        else:
+            candidate &= ~known & ((upper >= lower.max()) | (lower <= upper.min()))
+    return lower, upper, lower == upper, runs
+
+
+def diameter(graph):
+    '''
+    Exact diameter of a connected graph from eccentricity bounds, usually
+    after a few dozen BFS runs instead of one per node.
+    '''
+    if not graph.number_of_nodes():
+        return 0
+    lower, upper, known, runs = _bounding_eccentricities(graph, True)
+    return int(lower.max())
+
+
+def eccentricity_extremes(graph):
+    '''
+    Exact diameter, radius, periphery and center of a connected graph from
+    eccentricity bounds (see diameter); returns an Extremes.
+    '''
+    if not graph.number_of_nodes():
+        empty = np.zeros(0, dtype=np.int64)
+        return Extremes(0, 0, empty, empty, 0)
+    lower, upper, known, runs = _bounding_eccentricities(graph, False)
+    diameter, radius = int(lower.max()), int(upper.min())
+    return Extremes(diameter, radius, np.flatnonzero(known & (lower == diameter)),
+                    np.flatnonzero(known & (upper == radius)), runs)
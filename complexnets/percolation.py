@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+'''
+Node percolation: size of the giant component along a removal sequence.
+
+Instead of deleting nodes and relabelling components after every removal,
+the removal order is replayed backwards (Newman & Ziff): nodes are added
+back one at a time and merged with their present neighbors in a union-find,
+so the whole curve costs O(N + M) near-constant-time operations.
+'''
+
+import numpy as np
+
+
+def percolation_curve(graph, order):
+    '''
+    Giant component size after 0, 1, ..., len(order) removals of the nodes
+    in order. Nodes missing from order are never removed.
+    '''
+    n = graph.number_of_nodes()
+    order = np.asarray(order, dtype=np.int64)
+    offsets = graph.offsets.tolist()
+    neighbors = graph.neighbors.tolist()
+    parent = list(range(n))
+    size = [1] * n
+    present = [True] * n
+    for node in order.tolist():
+        present[node] = False
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def add(node, giant):
+        present[node] = True
+        root = node
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[i]
+            if not present[neighbor]:
+                continue
+            other = find(neighbor)
+            if other == root:
+                continue
+            # union by size
+            if size[other] > size[root]:
+                root, other = other, root
+            parent[other] = root
+            size[root] += size[other]
+        return max(giant, size[root])
+
+    # the nodes that survive every removal form the starting graph
+    giant = 0
+    survivors = [node for node in range(n) if present[node]]
+    for node in survivors:
+        present[node] = False
+    for node in survivors:
+        giant = add(node, giant)
+
+    removed = order.tolist()
+    curve = [0] * (len(removed) + 1)
+    curve[-1] = giant
+    for k in range(len(removed) - 1, -1, -1):
+        giant = add(removed[k], giant)
+        curve[k] = giant
+    return np.array(curve, dtype=np.int64)
+
+
+def random_order(graph, seed=None):
+    '''uniformly random removal order, for random failures'''
+    return np.random.RandomState(seed).permutation(graph.number_of_nodes())
+
+
+def degree_order(graph):
+    '''nodes from most to least connected, for a static targeted attack'''
+    return np.argsort(-graph.degree(), kind='mergesort')
+
+
+def adaptive_degree_order(graph):
+    '''
+    Removal order of an adaptive attack: always the node with the highest
+    degree in what is left of the graph.
+
+    Nodes are kept sorted by current degree in one array with the start of
+    each degree bucket (Batagelj & Zaversnik), so removing a node and
+    decrementing its neighbors costs O(deg).
+    '''
+    n = graph.number_of_nodes()
+    offsets = graph.offsets.tolist()
+    neighbors = graph.neighbors.tolist()
+    degree = graph.degree()
+
+    vert = np.argsort(degree, kind='mergesort').tolist()
+    start = np.searchsorted(degree[vert], np.arange(degree.max() + 1 if n else 0)).tolist()
+    pos = [0] * n
+    for i, node in enumerate(vert):
+        pos[node] = i
+    degree = degree.tolist()
+    removed = [False] * n
+
+    order = []
+    for last in range(n - 1, -1, -1):
+        node = vert[last]
+        removed[node] = True
+        order.append(node)
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[i]
+            if removed[neighbor]:
+                continue
+            # swap the neighbor to the front of its bucket, then shrink it
+            d = degree[neighbor]
+            first = start[d]
+            other = vert[first]
+            if other != neighbor:
+                vert[first], vert[pos[neighbor]] = neighbor, other
+                pos[other], pos[neighbor] = pos[neighbor], first
+            start[d] = first + 1
+            degree[neighbor] = d - 1
+    return np.array(order, dtype=np.int64)
+
+
+def failure_curve(graph, seed=None):
+    return percolation_curve(graph, random_order(graph, seed))
+
+
+def attack_curve(graph, adaptive=False):
+    if adaptive:
+        return percolation_curve(graph, adaptive_degree_order(graph))
+    return percolation_curve(graph, degree_order(graph))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+'''
+Bounded-memory running statistics for long streams of measurements.
+'''
+
+import math
+
+import numpy as np
+
+
+# values kept exactly before a quantile switches to its P-square sketch
+EXACT_VALUES = 1000
+
+
+class P2Quantile(object):
+    '''
+    Streaming estimate of one quantile with the P-square algorithm (Jain &
+    Chlamtac, 1985): five markers whose heights follow a piecewise
+    parabolic fit of the cumulative distribution.
+
+    The sketch is only accurate for long streams, so the first exact
+    values are kept as they are and the quantile is exact up to there;
+    past that, the markers start from the quantiles of those values.
+    '''
+
+    def __init__(self, p, exact=EXACT_VALUES):
+        self.p = p
+        self.exact = max(exact, 5)
+        self.count = 0
+        self.values = []
+        self.heights = []
+        self.positions = []
+        self.desired = []
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def _start_markers(self):
+        values = sorted(self.values)
+        n = len(values)
+        self.desired = [(n - 1) * increment for increment in self.increments]
+        positions = [0] * 5
+        for i in range(1, 5):
+            # strictly increasing, leaving room for the markers above
+            positions[i] = min(max(int(round(self.desired[i])), positions[i - 1] + 1), n - 5 + i)
+        self.positions = positions
+        self.heights = [values[i] for i in positions]
+        self.values = None
+
+    def add(self, value):
+        self.count += 1
+        if self.values is not None:
+            self.values.append(value)
+            if len(self.values) > self.exact:
+                self._start_markers()
+            return
+
+        heights = self.heights
+        positions = self.positions
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / \
+                        (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i, d):
+        q = self.heights
+        n = self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self):
+        if self.values is not None:
+            if not self.values:
+                return float('nan')
+            return float(np.percentile(self.values, 100 * self.p))
+        return self.heights[2]
+
+
+class RunningStats(object):
+    '''
+    Count, mean and variance (Welford's update) plus P-square sketches for
+    the requested quantiles, folded one value at a time.
+    '''
+
+    def __init__(self, quantiles=(0.5,)):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketches = {q: P2Quantile(q) for q in quantiles}
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        for sketch in self.sketches.values():
+            sketch.add(value)
+
+    def variance(self, ddof=0):
+        if self.count - ddof <= 0:
+            return float('nan')
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        return math.sqrt(self.variance(ddof))
+
+    def quantile(self, q):
+        return self.sketches[q].value()
+
+    def median(self):
+        return self.quantile(0.5)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+'''
+Memoized measurements keyed by the structure of the graph.
+
+A measurement is computed once per (graph structure, name, parameters) and
+then served from memory. The in-memory store is bounded by the byte size
+of what it holds and evicts least recently used entries; with a directory
+it also pickles every result there so later runs start warm. Pickles are
+also keyed by the source of this package and of the module defining the
+measurement, so a change to either recomputes instead of reusing results
+of the old code.
+'''
+
+import hashlib
+import os
+import pickle
+import sys
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from .cache import file_hash
+
+_fingerprints = weakref.WeakKeyDictionary()
+_code_fingerprints = {}
+
+
+def fingerprint(graph):
+    '''SHA-1 of the CSR arrays (and weights, if any), cached per graph object'''
+    if graph not in _fingerprints:
+        digest = hashlib.sha1()
+        for array in (graph.offsets, graph.neighbors):
+            array = np.ascontiguousarray(array, dtype=np.int64)
+            digest.update(array.view(np.uint8))
+        if graph.weights is not None:
+            digest.update(np.ascontiguousarray(graph.weights, dtype=np.float64).view(np.uint8))
+        _fingerprints[graph] = digest.hexdigest()
+    return _fingerprints[graph]
+
+
+def code_fingerprint(compute):
+    '''SHA-1 of the package sources and of the module defining compute, cached per module'''
+    module = getattr(compute, '__module__', None)
+    if module not in _code_fingerprints:
+        package = os.path.dirname(os.path.abspath(__file__))
+        files = sorted(os.path.join(package, name) for name in os.listdir(package)
+                       if name.endswith('.py'))
+        source = getattr(sys.modules.get(module), '__file__', None)
+        if source is not None and os.path.abspath(source) not in files:
+            files.append(os.path.abspath(source))
+        digest = hashlib.sha1()
+        for path in files:
+            digest.update(file_hash(path).encode('ascii'))
+        _code_fingerprints[module] = digest.hexdigest()
+    return _code_fingerprints[module]
+
+
+def _size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return sum(_size(item) for item in vars(value).values())
+    return sys.getsizeof(value)
+
+
+class MeasurementStore(object):
+
+    def __init__(self, max_bytes=1 << 30, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.used = 0
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.pkl')
+
+    def _remember(self, key, value):
+        size = _size(value)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = value
+        self.sizes[key] = size
+        self.used += size
+        while self.used > self.max_bytes:
+            old, _ = self.entries.popitem(last=False)
+            self.used -= self.sizes.pop(old)
+
+    def get(self, graph, name, compute, **parameters):
+        '''
+        Value of measurement name for graph, calling compute(graph,
+        **parameters) only if no equal graph has it stored yet.
+        '''
+        key = (fingerprint(graph), name, tuple(sorted(parameters.items())))
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        path = None
+        if self.directory is not None:
+            path = self._path(key + (code_fingerprint(compute),))
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        else:
+            value = compute(graph, **parameters)
+            if path is not None:
+                scratch = path + '.%d' % os.getpid()
+                with open(scratch, 'wb') as f:
+                    pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(scratch, path)
+        self._remember(key, value)
+        return value